@@ -1,9 +1,19 @@
+import atexit
 import logging
 import logging.handlers
+import queue
 import colorlog
 from pathlib import Path
 from config.settings import settings
 
+class _UnformattedQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are, leaving all formatting to the listener thread."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats the message and traceback in the caller's
+        # thread so records can be pickled; the listener shares this process
+        return record
+
 def setup_logging():
     """Set up comprehensive logging for the bot."""
     
@@ -55,11 +65,19 @@ def setup_logging():
     error_handler.setFormatter(file_formatter)
     error_handler.setLevel(logging.ERROR)
     
+    # Records are formatted and written on a listener thread, so logging a
+    # traceback from a coroutine never blocks the event loop on formatting, stderr or disk
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, error_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    
     # Clear existing handlers and add new ones
     root_logger.handlers.clear()
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(error_handler)
+    root_logger.addHandler(_UnformattedQueueHandler(log_queue))
     
     # Set specific logger levels
     logging.getLogger("discord").setLevel(logging.WARNING)
@@ -33,6 +33,7 @@ class Settings(BaseSettings):
     max_song_duration: int = 3600
     download_enabled: bool = True
     bass_boost_enabled: bool = True
+    executor_workers: int = 64
     
     # Logging Configuration
     log_level: str = "INFO"
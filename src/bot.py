@@ -1,10 +1,12 @@
 import asyncio
-import logging
 import sys
-import traceback
+from collections import deque
 from pathlib import Path
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set
 
+import aiohttp
 import discord
 from discord.ext import commands, tasks
 
@@ -17,6 +19,7 @@ from config.database import init_db
 from src.core.music_manager import music_manager
 from src.core.error_handler import ErrorHandler
 from src.core.database_manager import db_manager
+from src.utils.youtube import youtube_manager
 
 # Import command modules
 from src.commands.music_commands import MusicCommands
@@ -28,6 +31,11 @@ from src.commands.utility_commands import UtilityCommands
 from src.monitoring.health import get_health_monitor
 from src.web.dashboard import start_dashboard
 
+# Seconds the bot stays in a voice channel after the last listener leaves
+ALONE_TIMEOUT = 60
+# A channel gets at most one disconnect notice in this many seconds
+DISCONNECT_NOTICE_INTERVAL = 60
+
 class BasslineBot(commands.Bot):
     """Enhanced Discord music bot with professional features."""
     
@@ -42,7 +50,8 @@ class BasslineBot(commands.Bot):
         # Initialize startup time and error tracking BEFORE super().__init__
         self.startup_time = time.time()
         self.error_count = 0
-        self.recent_errors = []
+        # Keep only last 100 errors
+        self.recent_errors = deque(maxlen=100)
         
         super().__init__(
             command_prefix=self._get_prefix,
@@ -58,6 +67,13 @@ class BasslineBot(commands.Bot):
         # Initialize error handler AFTER super().__init__
         self.error_handler = ErrorHandler(self)
         self.ready_guilds = set()
+        # Shared HTTP session, created once the event loop is running
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        # Non-bot members in the bot's voice channel, kept from voice state events
+        self._listener_counts: Dict[int, int] = {}
+        self._alone_handles: Dict[int, asyncio.TimerHandle] = {}
+        self._voice_tasks: Set[asyncio.Task] = set()
+        self._last_notice_at: Dict[int, float] = {}
         
         logger.info(f"Initializing {settings.bot_name}")
     
@@ -76,6 +92,14 @@ class BasslineBot(commands.Bot):
         """Set up the bot."""
         logger.info("Setting up bot...")
         try:
+            # yt-dlp lookups run in the default executor; size it for many guilds
+            self.loop.set_default_executor(
+                ThreadPoolExecutor(max_workers=settings.executor_workers, thread_name_prefix="ytdl")
+            )
+            self.http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=600)
+            )
+            
             # Initialize database
             init_db()
             logger.info("Database initialized")
@@ -87,8 +111,12 @@ class BasslineBot(commands.Bot):
             await self.tree.sync()
             logger.info("Slash commands synced")
             
+            # Disconnect from voice when a guild's idle timer fires
+            music_manager.set_idle_handler(self._disconnect_idle)
+            
             # Start background tasks
             self.cleanup_task.start()
+            self.prefs_flush_task.start()
             if settings.metrics_enabled:
                 self.metrics_task.start()
             
@@ -101,10 +129,26 @@ class BasslineBot(commands.Bot):
             logger.info("Bot setup completed successfully")
             
         except Exception as e:
-            logger.error(f"Failed to set up bot: {e}")
-            traceback.print_exc()
+            logger.error(f"Failed to set up bot: {e}", exc_info=True)
             sys.exit(1)
     
+    async def close(self):
+        """Stop idle timers, leave voice and close the shared HTTP session along with the bot."""
+        music_manager.set_idle_handler(None)
+        for handle in self._alone_handles.values():
+            handle.cancel()
+        self._alone_handles.clear()
+        
+        # Leave every voice channel at once; Client.close would do it one guild at a time
+        await asyncio.gather(
+            *(vc.disconnect(force=True) for vc in self.voice_clients),
+            return_exceptions=True
+        )
+        
+        if self.http_session and not self.http_session.closed:
+            await self.http_session.close()
+        await super().close()
+    
     async def load_cogs(self):
         """Load all command cogs."""
         cogs = [
@@ -119,8 +163,7 @@ class BasslineBot(commands.Bot):
                 await self.add_cog(cog_class(self))
                 logger.info(f"Loaded cog: {name}")
             except Exception as e:
-                logger.error(f"Failed to load cog {name}: {e}")
-                traceback.print_exc()
+                logger.error(f"Failed to load cog {name}: {e}", exc_info=True)
     
     async def on_ready(self):
         """Called when bot is ready."""
@@ -175,19 +218,67 @@ class BasslineBot(commands.Bot):
     
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
         """Handle voice state updates."""
+        guild_id = member.guild.id
+        
         if member.id != self.user.id:
+            self._track_listener(member, before, after)
             return
         
-        guild_id = member.guild.id
-        
         # Bot was disconnected
         if before.channel and not after.channel:
             logger.info(f"Bot disconnected from voice in guild {guild_id}")
             music_manager.clear_guild_state(guild_id)
+            self._listener_counts.pop(guild_id, None)
+            self._cancel_alone_timer(guild_id)
+            return
         
         # Bot moved channels
-        elif before.channel != after.channel and after.channel:
+        if before.channel != after.channel and after.channel:
             logger.info(f"Bot moved to {after.channel.name} in guild {guild_id}")
+        
+        # Joined or moved: count the listeners once, then follow join/leave events
+        if after.channel:
+            self._listener_counts[guild_id] = sum(1 for m in after.channel.members if not m.bot)
+            self._check_alone(guild_id)
+    
+    def _track_listener(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        """Update the listener count when someone joins or leaves the bot's channel."""
+        guild_id = member.guild.id
+        if member.bot or before.channel == after.channel or guild_id not in self._listener_counts:
+            return
+        
+        bot_channel = member.guild.me.voice.channel if member.guild.me.voice else None
+        if not bot_channel:
+            return
+        
+        if before.channel == bot_channel:
+            self._listener_counts[guild_id] -= 1
+        if after.channel == bot_channel:
+            self._listener_counts[guild_id] += 1
+        self._check_alone(guild_id)
+    
+    def _check_alone(self, guild_id: int):
+        """Start or cancel the alone timer from the current listener count."""
+        if self._listener_counts.get(guild_id, 0) > 0:
+            self._cancel_alone_timer(guild_id)
+        elif guild_id not in self._alone_handles:
+            self._alone_handles[guild_id] = self.loop.call_later(ALONE_TIMEOUT, self._on_alone, guild_id)
+    
+    def _cancel_alone_timer(self, guild_id: int):
+        handle = self._alone_handles.pop(guild_id, None)
+        if handle:
+            handle.cancel()
+    
+    def _on_alone(self, guild_id: int):
+        self._alone_handles.pop(guild_id, None)
+        if self._listener_counts.get(guild_id, 0) > 0:
+            return
+        
+        task = asyncio.create_task(
+            self._leave_voice(guild_id, "Left the voice channel because everyone else left.")
+        )
+        self._voice_tasks.add(task)
+        task.add_done_callback(self._voice_tasks.discard)
     
     async def on_command_error(self, ctx: commands.Context, error: Exception):
         """Handle command errors."""
@@ -198,14 +289,10 @@ class BasslineBot(commands.Bot):
             'error_message': str(error),
             'command': ctx.command.name if ctx.command else 'Unknown',
             'guild_id': ctx.guild.id if ctx.guild else None,
-            'user_id': ctx.author.id,
-            'traceback': traceback.format_exc()
+            'user_id': ctx.author.id
         }
         
         self.recent_errors.append(error_info)
-        # Keep only last 100 errors
-        if len(self.recent_errors) > 100:
-            self.recent_errors.pop(0)
         
         # Log to database if possible
         if error_info['guild_id']:
@@ -232,13 +319,10 @@ class BasslineBot(commands.Bot):
             'error_message': str(error),
             'command': interaction.command.name if interaction.command else 'Unknown',
             'guild_id': interaction.guild.id if interaction.guild else None,
-            'user_id': interaction.user.id,
-            'traceback': traceback.format_exc()
+            'user_id': interaction.user.id
         }
         
         self.recent_errors.append(error_info)
-        if len(self.recent_errors) > 100:
-            self.recent_errors.pop(0)
         
         # Log to database
         if error_info['guild_id']:
@@ -272,45 +356,73 @@ class BasslineBot(commands.Bot):
         except ImportError:
             logger.warning("Dashboard dependencies not installed")
         except Exception as e:
-            logger.error(f"Failed to start dashboard: {e}")
-            traceback.print_exc()
+            logger.error(f"Failed to start dashboard: {e}", exc_info=True)
     
     @tasks.loop(minutes=30)
     async def cleanup_task(self):
         """Periodic cleanup task."""
         try:
-            # Clean up inactive voice connections
-            current_time = time.time()
-            inactive_guilds = []
-            
-            for guild_id, last_activity in music_manager.last_activity.items():
-                if current_time - last_activity > settings.idle_timeout:
-                    vc = music_manager.voice_clients.get(guild_id)
-                    if vc and not vc.is_playing():
-                        inactive_guilds.append(guild_id)
-            
-            for guild_id in inactive_guilds:
-                vc = music_manager.voice_clients.get(guild_id)
-                if vc:
-                    try:
-                        await vc.disconnect()
-                        logger.info(f"Disconnected from inactive guild {guild_id}")
-                    except:
-                        pass
-                music_manager.clear_guild_state(guild_id)
-            
             # Clean up old downloads
-            try:
-                from src.utils.youtube import youtube_manager
-                youtube_manager.cleanup_old_downloads()
-            except ImportError:
-                pass  # youtube_manager might not exist yet
+            youtube_manager.cleanup_old_downloads()
             
             logger.debug("Cleanup task completed")
             
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
     
+    async def _disconnect_idle(self, guild_id: int):
+        """Leave voice in a guild whose idle timer expired."""
+        try:
+            vc = music_manager.voice_clients.get(guild_id)
+            if not (vc and vc.is_connected()):
+                # Stale entry: nothing to leave and nobody to tell
+                music_manager.clear_guild_state(guild_id)
+                return
+            if vc.is_playing():
+                # A long track is not inactivity; check again after another timeout
+                music_manager.update_last_activity(guild_id)
+                return
+            
+            await self._leave_voice(guild_id, "Left the voice channel due to inactivity.")
+        except Exception as e:
+            logger.error(f"Error disconnecting idle guild {guild_id}: {e}")
+    
+    async def _leave_voice(self, guild_id: int, reason: str):
+        """Disconnect from voice, tell the guild why, and clear its playback state."""
+        vc = music_manager.voice_clients.get(guild_id)
+        if vc is None:
+            # No registry entry, but discord.py may still hold a connection
+            guild = self.get_guild(guild_id)
+            vc = guild.voice_client if guild else None
+        if vc:
+            try:
+                await vc.disconnect()
+                logger.info(f"Disconnected from guild {guild_id}: {reason}")
+            except Exception as e:
+                logger.debug(f"Error disconnecting from guild {guild_id}: {e}")
+            self._notify_disconnect(guild_id, reason)
+        music_manager.clear_guild_state(guild_id)
+    
+    def _notify_disconnect(self, guild_id: int, reason: str):
+        """Post the disconnect reason in the music cog's now playing channel."""
+        music_cog = self.get_cog('MusicCommands')
+        guild = self.get_guild(guild_id)
+        if not music_cog or not guild:
+            return
+        
+        # Leaving again soon after a rejoin shouldn't post a second notice
+        now = time.monotonic()
+        if now - self._last_notice_at.get(guild_id, float('-inf')) < DISCONNECT_NOTICE_INTERVAL:
+            return
+        
+        embed = discord.Embed(
+            title="👋 Disconnected",
+            description=reason,
+            color=discord.Color.orange()
+        )
+        if music_cog.notify(guild, embed):
+            self._last_notice_at[guild_id] = now
+    
     @tasks.loop(minutes=5)
     async def metrics_task(self):
         """Collect metrics."""
@@ -324,8 +436,17 @@ class BasslineBot(commands.Bot):
         except Exception as e:
             logger.error(f"Error collecting metrics: {e}")
     
+    @tasks.loop(minutes=1)
+    async def prefs_flush_task(self):
+        """Persist changed user preferences."""
+        try:
+            music_manager.flush_user_prefs()
+        except Exception as e:
+            logger.error(f"Error flushing user preferences: {e}")
+    
     @cleanup_task.before_loop
     @metrics_task.before_loop
+    @prefs_flush_task.before_loop
     async def before_tasks(self):
         """Wait for bot to be ready before starting tasks."""
         await self.wait_until_ready()
@@ -354,13 +475,14 @@ async def main():
     except KeyboardInterrupt:
         logger.info("Bot shutdown requested")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
-        traceback.print_exc()
+        logger.error(f"Fatal error: {e}", exc_info=True)
         sys.exit(1)
     finally:
         if not bot.is_closed():
             await bot.close()
         
+        music_manager.flush_user_prefs()
+        
         # Stop health monitoring
         health_monitor = get_health_monitor()
         if health_monitor:
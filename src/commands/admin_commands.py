@@ -1,6 +1,7 @@
 ### src/commands/admin_commands.py
 import logging
 import time
+from datetime import timedelta
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -312,17 +313,33 @@ class AdminCommands(commands.Cog):
             
             await interaction.response.defer(ephemeral=True)
             
-            # Delete bot messages
-            deleted = 0
+            # Collect bot messages; the bulk delete endpoint only accepts messages under 14 days old
+            cutoff = discord.utils.utcnow() - timedelta(days=14)
+            me = self.bot.user
+            recent, older = [], []
             async for message in interaction.channel.history(limit=count):
-                if message.author == self.bot.user:
-                    try:
-                        await message.delete()
-                        deleted += 1
-                    except discord.NotFound:
-                        pass
-                    except discord.Forbidden:
-                        break
+                if message.author == me:
+                    (recent if message.created_at > cutoff else older).append(message)
+            
+            deleted = 0
+            one_by_one = older
+            if recent:
+                try:
+                    # One bulk request for 2+ messages; delete_messages does a plain delete for a single one
+                    await interaction.channel.delete_messages(recent)
+                    deleted += len(recent)
+                except discord.NotFound:
+                    pass  # Already deleted by someone else
+                except discord.Forbidden:
+                    # Bulk deletes need Manage Messages even for our own messages; single deletes don't
+                    one_by_one = recent + older
+            
+            for message in one_by_one:
+                try:
+                    await message.delete()
+                    deleted += 1
+                except discord.NotFound:
+                    pass
             
             embed = discord.Embed(
                 title="🧹 Cleanup Complete",
@@ -334,4 +351,7 @@ class AdminCommands(commands.Cog):
             logger.info(f"Cleaned up {deleted} messages in guild {interaction.guild.id}")
             
         except discord.Forbidden:
-            await interaction.response.send_message("❌ You do not have permission to manage messages.", ephemeral=True)
\ No newline at end of file
+            if interaction.response.is_done():
+                await interaction.followup.send("❌ I don't have permission to delete messages here.", ephemeral=True)
+            else:
+                await interaction.response.send_message("❌ I don't have permission to delete messages here.", ephemeral=True)
\ No newline at end of file
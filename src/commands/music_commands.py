@@ -1,39 +1,182 @@
 import asyncio
+import functools
+import itertools
 import logging
 import time
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional
-import os
+from typing import Dict, Optional, Set, Tuple
 
 from src.core.music_manager import music_manager, Track, LoopState
 from src.core.database_manager import db_manager
 from src.utils.checks import is_dj_or_admin_slash, is_in_voice
 from src.utils.discord_voice import join_voice_channel, create_audio_source
 from src.utils.youtube import youtube_manager, YouTubeError
+from src.utils.query_cache import query_cache
 from src.utils.validators import validate_search_query, validate_volume
 from src.utils.helpers import format_duration, Timer, ProgressBar
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Number of upcoming tracks resolved ahead of playback, and the cap on
+# concurrent yt-dlp lookups across all guilds
+PREFETCH_WINDOW = 2
+MAX_CONCURRENT_PREFETCHES = 3
+# Now playing messages inside this window (seconds) collapse into the last one
+NOW_PLAYING_DEBOUNCE = 0.75
+# Delay before moving past a track that failed to start, and how many
+# consecutive failures are tolerated before playback gives up
+PLAYBACK_RETRY_DELAY = 2
+MAX_PLAYBACK_FAILURES = 3
+
+NOW_PLAYING_COLOR = discord.Color.blue().value
+
+# Fixed replies shared by the playback and queue commands
+MSG_NOTHING_PLAYING = "❌ Nothing is currently playing."
+MSG_NOTHING_PAUSED = "❌ Nothing is currently paused."
+MSG_PAUSED = "⏸️ Paused playback."
+MSG_RESUMED = "▶️ Resumed playback."
+MSG_STOPPED = "🛑 Stopped music and cleared the queue."
+MSG_QUEUE_EMPTY = "❌ Queue is empty."
+MSG_QUEUE_ALREADY_EMPTY = "❌ Queue is already empty."
+# Indexed by the new bass boost state
+MSG_BASS_BOOST = ("🔈 Bass boost disabled", "🔊 Bass boost enabled")
+
 class MusicCommands(commands.Cog):
     """Music playback commands."""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.active_players = {}
+        self._prefetch_tasks: Dict[int, asyncio.Task] = {}
+        self._prefetch_sem = asyncio.Semaphore(MAX_CONCURRENT_PREFETCHES)
+        # In-flight prefetch resolutions keyed by id(track)
+        self._pending_resolves: Dict[int, asyncio.Task] = {}
+        # Strong references to fire-and-forget sends and retries until they finish
+        self._send_tasks: Set[asyncio.Task] = set()
+        # guild_id -> retry delay being waited out after a track failed to start
+        self._pending_retries: Dict[int, asyncio.Future] = {}
+        # guild_id -> pending debounced now playing send
+        self._pending_np: Dict[int, asyncio.TimerHandle] = {}
+        # guild_id -> channel_id used for now playing messages
+        self._np_channel_cache: Dict[int, int] = {}
+        # channel_id -> (can_send, expires_at)
+        self._send_perm_cache: Dict[int, Tuple[bool, float]] = {}
+        # guild_id -> ((queue_version, queue_length), rendered "Up Next" body)
+        self._queue_render_cache: Dict[int, Tuple[Tuple[int, int], str]] = {}
+        # Guild and user ids whose database records this process has already ensured
+        self._known_guilds: Set[int] = set()
+        self._known_users: Set[int] = set()
+        # Bookkeeping events drained on the event loop by _log_worker
+        self._log_queue: asyncio.Queue = asyncio.Queue()
+        self._log_worker_task: Optional[asyncio.Task] = None
     
     async def cog_load(self):
         """Called when cog is loaded."""
+        self._log_worker_task = asyncio.create_task(self._log_worker())
+        query_cache.start()
         logger.info("Music commands loaded")
     
+    async def cog_unload(self):
+        """Called when cog is unloaded."""
+        if self._log_worker_task:
+            self._log_worker_task.cancel()
+        for handle in (*self._pending_np.values(), *self._pending_retries.values()):
+            handle.cancel()
+        self._pending_np.clear()
+        self._pending_retries.clear()
+        query_cache.stop()
+    
+    async def _log_worker(self):
+        """Process bookkeeping events off the playback and command paths."""
+        while True:
+            kind, payload = await self._log_queue.get()
+            try:
+                if kind == 'command_usage':
+                    with db_manager:
+                        db_manager.log_command_usage(**payload)
+                elif kind == 'song_play':
+                    if payload['error']:
+                        music_manager.metrics['errors'] += 1
+                    if payload['started_at']:
+                        music_manager.metrics['total_playtime'] += int(payload['finished_at'] - payload['started_at'])
+            except Exception as e:
+                logger.error(f"Error processing {kind} event: {e}")
+            finally:
+                self._log_queue.task_done()
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        """Drop cached channel lookups for a deleted channel."""
+        self._invalidate_channel_cache(channel)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        """Drop cached channel lookups when overwrites or names change."""
+        self._invalidate_channel_cache(after)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        """Role permission changes can change where the bot may send."""
+        if before.permissions != after.permissions and after in after.guild.me.roles:
+            self._invalidate_guild_channel_cache(after.guild)
+    
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Drop cached channel lookups when the bot's own roles change."""
+        if after.id == self.bot.user.id and before.roles != after.roles:
+            self._invalidate_guild_channel_cache(after.guild)
+    
+    def _invalidate_guild_channel_cache(self, guild: discord.Guild):
+        """Forget cached permissions and now playing channel for a whole guild."""
+        # Order doesn't matter here, so skip the sort text_channels does
+        for channel in guild.channels:
+            self._send_perm_cache.pop(channel.id, None)
+        self._np_channel_cache.pop(guild.id, None)
+    
+    def _invalidate_channel_cache(self, channel: discord.abc.GuildChannel):
+        """Forget cached permissions and now playing channel for a channel."""
+        self._send_perm_cache.pop(channel.id, None)
+        if self._np_channel_cache.get(channel.guild.id) == channel.id:
+            self._np_channel_cache.pop(channel.guild.id, None)
+    
+    def _can_send(self, channel: discord.TextChannel) -> bool:
+        """Check send permission, caching the result for 60 seconds."""
+        now = time.monotonic()
+        cached = self._send_perm_cache.get(channel.id)
+        if cached and cached[1] > now:
+            return cached[0]
+        
+        can_send = channel.permissions_for(channel.guild.me).send_messages
+        self._send_perm_cache[channel.id] = (can_send, now + 60)
+        return can_send
+    
+    def _get_now_playing_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """Resolve the channel for now playing messages, caching the fallback scan."""
+        if guild.system_channel:
+            return guild.system_channel
+        
+        channel_id = self._np_channel_cache.get(guild.id)
+        if channel_id:
+            channel = guild.get_channel(channel_id)
+            if channel and self._can_send(channel):
+                return channel
+            self._np_channel_cache.pop(guild.id, None)
+        
+        channel = next((c for c in guild.text_channels if self._can_send(c)), None)
+        if channel:
+            self._np_channel_cache[guild.id] = channel.id
+        return channel
+    
     @app_commands.command(name="play", description="Play a song from YouTube")
     @app_commands.describe(query="Song name or YouTube URL")
     async def play(self, interaction: discord.Interaction, query: str):
         """Enhanced play command with database-first architecture."""
         timer = Timer().start()
+        # Only log usage once a track was actually queued or started; cheap
+        # validation rejections return early without any database writes
+        performed_work = False
         
         try:
             # Validate input
@@ -44,14 +187,9 @@ class MusicCommands(commands.Cog):
             
             await interaction.response.defer()
             
-            guild_id = interaction.guild.id
+            guild_id = interaction.guild_id
             user = interaction.user
             
-            # AUTO-CREATE Guild and User records (this was missing!)
-            with db_manager:
-                db_manager.get_or_create_guild(guild_id, interaction.guild.name)
-                db_manager.get_or_create_user(user.id, user.display_name)
-            
             # Ensure user is in voice channel
             if not user.voice or not user.voice.channel:
                 await interaction.followup.send("❌ You must be in a voice channel to play music.", ephemeral=True)
@@ -62,7 +200,16 @@ class MusicCommands(commands.Cog):
             if not vc:
                 return
             
-            music_manager.voice_clients[guild_id] = vc
+            # AUTO-CREATE Guild and User records once per process, not on every /play
+            if guild_id not in self._known_guilds or user.id not in self._known_users:
+                with db_manager:
+                    db_manager.get_or_create_guild(guild_id, interaction.guild.name)
+                    db_manager.get_or_create_user(user.id, user.display_name)
+                self._known_guilds.add(guild_id)
+                self._known_users.add(user.id)
+            
+            if music_manager.voice_clients.get(guild_id) is not vc:
+                music_manager.voice_clients[guild_id] = vc
             
             # USE NEW DATABASE-FIRST METHOD
             try:
@@ -83,7 +230,8 @@ class MusicCommands(commands.Cog):
                 duration=video_info['duration'],
                 thumbnail=video_info['thumbnail'],
                 uploader=video_info['uploader'],
-                requested_by=user
+                requested_by=user,
+                prepared_info=video_info
             )
             
             # Check if currently playing
@@ -91,10 +239,12 @@ class MusicCommands(commands.Cog):
                 # Add to queue
                 success = await music_manager.add_to_queue(guild_id, track)
                 if success:
+                    performed_work = True
+                    
                     # ENHANCED EMBED with cache status
                     embed = discord.Embed(
                         title="✅ Added to Queue",
-                        description=f"**{track.title}**\nDuration: {format_duration(track.duration)}",
+                        description=f"**{track.title}**\nDuration: {track.duration_str}",
                         color=discord.Color.green()
                     )
                     
@@ -122,6 +272,7 @@ class MusicCommands(commands.Cog):
                 # Add to queue first, then start playing
                 success = await music_manager.add_to_queue(guild_id, track)
                 if success:
+                    performed_work = True
                     first_track = music_manager.pop_next_track(guild_id)
                     if first_track:
                         await self._play_track(interaction, vc, first_track, video_info)
@@ -130,14 +281,14 @@ class MusicCommands(commands.Cog):
             
             # Log usage (this creates Usage records)
             timer.stop()
-            with db_manager:
-                db_manager.log_command_usage(
-                    guild_id=guild_id,
-                    user_id=user.id,
-                    command_name="play",
-                    execution_time=timer.elapsed(),
-                    success=True
-                )
+            if performed_work:
+                self._log_queue.put_nowait(('command_usage', {
+                    'guild_id': guild_id,
+                    'user_id': user.id,
+                    'command_name': "play",
+                    'execution_time': timer.elapsed(),
+                    'success': True
+                }))
         
         except Exception as e:
             logger.error(f"Error in enhanced play command: {e}", exc_info=True)
@@ -152,31 +303,21 @@ class MusicCommands(commands.Cog):
                 pass
             
             # Log failed usage
-            with db_manager:
-                db_manager.log_command_usage(
-                    guild_id=interaction.guild.id,
-                    user_id=interaction.user.id,
-                    command_name="play",
-                    execution_time=timer.elapsed(),
-                    success=False,
-                    error_message=str(e)
-                )
+            self._log_queue.put_nowait(('command_usage', {
+                'guild_id': interaction.guild_id,
+                'user_id': interaction.user.id,
+                'command_name': "play",
+                'execution_time': timer.elapsed(),
+                'success': False,
+                'error_message': str(e)
+            }))
     
     async def _play_track(self, interaction: discord.Interaction, voice_client: discord.VoiceClient, track: Track, video_info: dict):
         """Enhanced track playing with database integration."""
+        guild_id = interaction.guild_id
+        
         try:
-            # Get user preferences
-            bass_boost = music_manager.get_bass_boost(track.requested_by.id)
-            volume = music_manager.get_user_volume(track.requested_by.id)
-            
-            # Create audio source
-            audio_source = await create_audio_source(track, bass_boost=bass_boost, volume=volume)
-            
-            # Set now playing
-            music_manager.set_now_playing(interaction.guild.id, track, voice_client)
-            
-            # Play audio
-            voice_client.play(audio_source, after=lambda e: self._handle_playback_finished(interaction.guild.id, e))
+            await self._start_track(guild_id, voice_client, track)
             
             # ENHANCED now playing embed
             embed = discord.Embed(
@@ -185,7 +326,7 @@ class MusicCommands(commands.Cog):
                 color=discord.Color.blue()
             )
             
-            embed.add_field(name="Duration", value=format_duration(track.duration), inline=True)
+            embed.add_field(name="Duration", value=track.duration_str, inline=True)
             embed.add_field(name="Requested by", value=track.requested_by.mention, inline=True)
             embed.add_field(name="Uploader", value=track.uploader, inline=True)
             
@@ -223,131 +364,219 @@ class MusicCommands(commands.Cog):
             else:
                 await interaction.response.send_message(embed=embed)
             
-            logger.info(f"Started playing: {track.title} in guild {interaction.guild.id}")
+            logger.info(f"Started playing: {track.title} in guild {guild_id}")
             
         except Exception as e:
             logger.error(f"Error playing enhanced track: {e}", exc_info=True)
             await interaction.followup.send(f"❌ Error playing track: {str(e)}", ephemeral=True)
     
-    def _handle_playback_finished(self, guild_id: int, error):
-        """Handle when a track finishes playing."""
+    async def _start_track(self, guild_id: int, voice_client: discord.VoiceClient, track: Track):
+        """Build the audio source for a track and start playing it."""
+        bass_boost = music_manager.get_bass_boost(track.requester_id)
+        volume = music_manager.get_user_volume(track.requester_id)
+        
+        # Reuse a prefetch that is still resolving this track rather than resolving it twice
+        if not track.prepared_info:
+            await self._wait_for_prefetch(track)
+        
+        audio_source = await create_audio_source(track, bass_boost=bass_boost, volume=volume)
+        music_manager.set_now_playing(guild_id, track, voice_client)
+        
+        # One bound callback for every start path; partial keeps interactions out of it
+        voice_client.play(audio_source, after=functools.partial(self._handle_playback_finished, guild_id, track))
+        self._schedule_prefetch(guild_id)
+    
+    def _handle_playback_finished(self, guild_id: int, track: Track, error):
+        """Handle when a track finishes playing.
+        
+        Runs on discord.py's audio thread, so it only schedules work on the
+        event loop and never touches the database itself.
+        """
         if error:
-            logger.error(f"Playback error in guild {guild_id}: {error}")
+            logger.error(f"Playback error in guild {guild_id} for {track.title}: {error}")
         
-        # Schedule next track using thread-safe method
-        asyncio.run_coroutine_threadsafe(
-            self._play_next(guild_id), 
-            self.bot.loop
-        )
+        # Snapshot before _play_next can replace the now playing entry
+        now_playing = music_manager.get_now_playing(guild_id)
+        
+        # A looped track is resolved again on its next pass rather than reusing this one
+        track.prepared_info = None
+        
+        # Hand the next track to the event loop and return straight away;
+        # _play_next logs its own errors
+        self.bot.loop.call_soon_threadsafe(self._spawn_play_next, guild_id)
+        
+        event = {
+            'guild_id': guild_id,
+            'url': track.url,
+            'error': error is not None,
+            'started_at': now_playing.start_time if now_playing and now_playing.track is track else None,
+            'finished_at': time.time()
+        }
+        self.bot.loop.call_soon_threadsafe(self._log_queue.put_nowait, ('song_play', event))
 
-    async def _create_audio_source(self, track: Track, video_info: dict, bass_boost: bool = False, volume: float = 0.5) -> discord.AudioSource:
-        """Create audio source with priority for downloaded files."""
-        try:
-            # FFmpeg options
-            ffmpeg_options = {
-                'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
-                'options': f'-vn -filter:a "volume={volume}"'
-            }
-            
-            # Add bass boost if enabled
-            if bass_boost:
-                bass_filter = 'bass=g=4:f=70:w=0.4,equalizer=f=125:t=q:w=1:g=2'
-                ffmpeg_options['options'] += f' -af "{bass_filter}"'
-            
-            # Priority order: downloaded file > stream URL
-            source_url = None
-            
-            # 1. Check for downloaded file in video_info
-            if video_info.get('downloaded_file') and os.path.exists(video_info['downloaded_file']):
-                source_url = video_info['downloaded_file']
-                logger.debug(f"Using downloaded file: {source_url}")
-            
-            # 2. Check database for existing download
-            elif track.url:
-                existing_path = db_manager.get_downloaded_song_path(track.url)
-                if existing_path:
-                    source_url = existing_path
-                    logger.debug(f"Using database cached file: {source_url}")
-            
-            # 3. Fall back to streaming
-            if not source_url:
-                source_url = video_info.get('stream_url')
-                logger.debug(f"Using stream URL: {source_url[:50]}...")
-            
-            if not source_url:
-                raise YouTubeError("No audio source available")
-            
-            # Create audio source
-            audio_source = discord.FFmpegPCMAudio(source_url, **ffmpeg_options)
-            
-            logger.debug(f"Created audio source for: {track.title}")
-            return audio_source
-            
-        except Exception as e:
-            logger.error(f"Error creating enhanced audio source: {e}")
-            raise YouTubeError(f"Failed to create audio source: {str(e)}")
+    def _spawn_play_next(self, guild_id: int):
+        """Advance the queue in a background task that is kept referenced until it finishes."""
+        task = asyncio.create_task(self._play_next(guild_id))
+        self._send_tasks.add(task)
+        task.add_done_callback(self._send_tasks.discard)
     
     async def _play_next(self, guild_id: int):
-        """Play the next track in queue."""
-        try:
-            loop_state = music_manager.get_loop_state(guild_id)
-            now_playing = music_manager.get_now_playing(guild_id)
-            
-            next_track = None
-            
-            # Handle loop modes
-            if loop_state == LoopState.SINGLE and now_playing:
-                # For single loop, replay the same track without removing from queue
-                next_track = now_playing.track
-            elif loop_state == LoopState.QUEUE and now_playing:
-                # For queue loop, move current track to end of queue
-                await music_manager.add_to_queue(guild_id, now_playing.track)
-                next_track = music_manager.pop_next_track(guild_id)  # FIXED: Use pop_next_track
-            else:
-                # Normal mode: get next track and remove from queue
-                next_track = music_manager.pop_next_track(guild_id)  # FIXED: Use pop_next_track
-            
-            if next_track:
-                vc = music_manager.voice_clients.get(guild_id)
-                if vc and vc.is_connected():
-                    # Get a text channel to send the now playing message
-                    guild = self.bot.get_guild(guild_id)
-                    if guild:
-                        channel = None
-                        if guild.system_channel:
-                            channel = guild.system_channel
-                        else:
-                            channel = next((c for c in guild.text_channels if c.permissions_for(guild.me).send_messages), None)
+        """Play the next track in queue, moving past up to MAX_PLAYBACK_FAILURES failed tracks in a row."""
+        # Counted per call so every failure run starts from the first retry
+        failures = 0
+        while True:
+            async with music_manager.play_locks[guild_id]:
+                # A second trigger (skip racing the after callback) must not advance the queue again
+                voice = music_manager.get_voice_status(guild_id)
+                if voice.playing or voice.paused:
+                    return
+                vc = voice.vc
+                
+                try:
+                    next_track = music_manager.advance_queue(guild_id)
+                    
+                    if next_track:
+                        if vc:
+                            # Get a text channel to send the now playing message
+                            guild = self.bot.get_guild(guild_id)
+                            if guild:
+                                channel = self._get_now_playing_channel(guild)
+                                
+                                if channel:
+                                    await self._start_track(guild_id, vc, next_track)
+                                    
+                                    # Send now playing message without holding up the transition
+                                    self._announce_now_playing(guild_id, channel, next_track)
+                    else:
+                        # Queue is empty - clear now playing
+                        self._cancel_now_playing_announcement(guild_id)
+                        music_manager.clear_now_playing(guild_id)
+                        logger.info(f"Queue finished in guild {guild_id}")
                         
-                        if channel:
-                            bass_boost = music_manager.get_bass_boost(next_track.requested_by.id)
-                            volume = music_manager.get_user_volume(next_track.requested_by.id)
-                            
-                            audio_source = await create_audio_source(next_track, bass_boost=bass_boost, volume=volume)
-                            music_manager.set_now_playing(guild_id, next_track, vc)
-                            
-                            vc.play(audio_source, after=lambda e: self._handle_playback_finished(guild_id, e))
-                            
-                            # Send now playing message
-                            embed = self._create_now_playing_embed(next_track)
-                            await channel.send(embed=embed)
-            else:
-                # Queue is empty - clear now playing
-                music_manager.now_playing.pop(guild_id, None)
-                logger.info(f"Queue finished in guild {guild_id}")
+                        # Send queue finished message
+                        guild = self.bot.get_guild(guild_id)
+                        if guild and guild.system_channel:
+                            embed = discord.Embed(
+                                title="🎵 Queue Finished",
+                                description="All songs have been played!",
+                                color=discord.Color.blue()
+                            )
+                            self._send_in_background(guild.system_channel.send(embed=embed))
+                    return
                 
-                # Send queue finished message
-                guild = self.bot.get_guild(guild_id)
-                if guild and guild.system_channel:
-                    embed = discord.Embed(
-                        title="🎵 Queue Finished",
-                        description="All songs have been played!",
-                        color=discord.Color.blue()
-                    )
-                    await guild.system_channel.send(embed=embed)
+                except Exception as e:
+                    logger.error(f"Error in _play_next: {e}", exc_info=True)
+                    # The previous track is already back in a looped queue; leaving it as
+                    # now playing would make the retry's advance_queue append it again
+                    music_manager.clear_now_playing(guild_id)
+                    failures += 1
+                    if failures > MAX_PLAYBACK_FAILURES:
+                        logger.warning(f"Stopping playback in guild {guild_id} after {MAX_PLAYBACK_FAILURES} failed tracks")
+                        return
+            
+            # Wait outside the lock so commands aren't blocked; /stop cancels the wait
+            if not await self._wait_retry_delay(guild_id):
+                return
     
-        except Exception as e:
-            logger.error(f"Error in _play_next: {e}", exc_info=True)
+    async def _wait_retry_delay(self, guild_id: int) -> bool:
+        """Sleep PLAYBACK_RETRY_DELAY; False if _cancel_retry cut the wait short."""
+        self._cancel_retry(guild_id)
+        delay = self._pending_retries[guild_id] = asyncio.ensure_future(asyncio.sleep(PLAYBACK_RETRY_DELAY))
+        try:
+            await asyncio.wait((delay,))
+        finally:
+            if self._pending_retries.get(guild_id) is delay:
+                del self._pending_retries[guild_id]
+        return not delay.cancelled()
+    
+    def _cancel_retry(self, guild_id: int):
+        delay = self._pending_retries.pop(guild_id, None)
+        if delay:
+            delay.cancel()
+    
+    def _announce_now_playing(self, guild_id: int, channel: discord.abc.Messageable, track: Track):
+        """Schedule a now playing message; rapid skips only post the last track."""
+        self._cancel_now_playing_announcement(guild_id)
+        self._pending_np[guild_id] = self.bot.loop.call_later(
+            NOW_PLAYING_DEBOUNCE, self._send_now_playing, guild_id, channel, track
+        )
+    
+    def _cancel_now_playing_announcement(self, guild_id: int):
+        handle = self._pending_np.pop(guild_id, None)
+        if handle:
+            handle.cancel()
+    
+    def _send_now_playing(self, guild_id: int, channel: discord.abc.Messageable, track: Track):
+        self._pending_np.pop(guild_id, None)
+        embed = self._create_now_playing_embed(track)
+        self._send_in_background(channel.send(embed=embed))
+    
+    def notify(self, guild: discord.Guild, embed: discord.Embed) -> bool:
+        """Post an embed in the guild's now playing channel without waiting on the send."""
+        channel = self._get_now_playing_channel(guild)
+        if not channel:
+            return False
+        self._send_in_background(channel.send(embed=embed))
+        return True
+    
+    def _send_in_background(self, coro):
+        """Send a Discord message without awaiting the HTTP round trip."""
+        task = asyncio.create_task(coro)
+        self._send_tasks.add(task)
+        task.add_done_callback(self._on_send_done)
+    
+    def _on_send_done(self, task: asyncio.Task):
+        self._send_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Failed to send playback message: {task.exception()}")
+    
+    def _schedule_prefetch(self, guild_id: int):
+        """Start resolving the next queued tracks while the current one plays."""
+        self._cancel_prefetch(guild_id)
+        if music_manager.get_queue(guild_id):
+            self._prefetch_tasks[guild_id] = asyncio.create_task(self._prefetch_window(guild_id))
+    
+    def _cancel_prefetch(self, guild_id: int):
+        """Cancel any in-flight prefetch for a guild."""
+        task = self._prefetch_tasks.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+    
+    async def _prefetch_window(self, guild_id: int):
+        """Resolve stream info for the next few queued tracks ahead of time."""
+        try:
+            upcoming = list(itertools.islice(music_manager.get_queue(guild_id), PREFETCH_WINDOW))
+            
+            for track in upcoming:
+                if track.fresh_prepared_info(query_cache.ttl) or id(track) in self._pending_resolves:
+                    continue
+                
+                resolve = asyncio.create_task(self._resolve_upcoming(track))
+                self._pending_resolves[id(track)] = resolve
+                try:
+                    await resolve
+                    logger.debug("Prefetched upcoming track: %s in guild %s", track.title, guild_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Best effort only - _play_next resolves the track itself on a miss
+                    logger.debug("Prefetch failed for %s in guild %s: %s", track.title, guild_id, e)
+                finally:
+                    self._pending_resolves.pop(id(track), None)
+        finally:
+            if self._prefetch_tasks.get(guild_id) is asyncio.current_task():
+                self._prefetch_tasks.pop(guild_id, None)
+    
+    async def _resolve_upcoming(self, track: Track):
+        async with self._prefetch_sem:
+            track.prepared_info = await youtube_manager.get_info(track.query, download=settings.download_enabled)
+    
+    async def _wait_for_prefetch(self, track: Track):
+        """Wait for an in-flight prefetch of a track to finish, if there is one."""
+        pending = self._pending_resolves.get(id(track))
+        if pending:
+            # wait() never raises the prefetch's own error; a miss just falls through
+            await asyncio.wait([pending])
     
     async def _send_now_playing_embed(self, interaction: discord.Interaction, track: Track, video_info: dict):
         """Send enhanced now playing embed with download status."""
@@ -357,7 +586,7 @@ class MusicCommands(commands.Cog):
             color=discord.Color.blue()
         )
         
-        embed.add_field(name="Duration", value=format_duration(track.duration), inline=True)
+        embed.add_field(name="Duration", value=track.duration_str, inline=True)
         embed.add_field(name="Requested by", value=track.requested_by.mention, inline=True)
         embed.add_field(name="Uploader", value=track.uploader, inline=True)
         
@@ -400,27 +629,27 @@ class MusicCommands(commands.Cog):
     
     def _create_now_playing_embed(self, track: Track) -> discord.Embed:
         """Create now playing embed."""
-        embed = discord.Embed(
-            title="🎶 Now Playing",
-            description=f"**{track.title}**",
-            color=discord.Color.blue()
-        )
-        
-        embed.add_field(name="Duration", value=format_duration(track.duration), inline=True)
-        embed.add_field(name="Requested by", value=track.requested_by.mention, inline=True)
-        embed.add_field(name="Uploader", value=track.uploader, inline=True)
-        
+        # Built from one payload; this runs on every track transition
+        payload = {
+            'title': "🎶 Now Playing",
+            'description': f"**{track.title}**",
+            'color': NOW_PLAYING_COLOR,
+            'fields': [
+                {'name': "Duration", 'value': track.duration_str, 'inline': True},
+                {'name': "Requested by", 'value': track.requested_by.mention, 'inline': True},
+                {'name': "Uploader", 'value': track.uploader, 'inline': True},
+            ],
+            'footer': {'text': f"Added {format_duration(int(time.time() - track.added_at))} ago"},
+        }
         if track.thumbnail:
-            embed.set_thumbnail(url=track.thumbnail)
-        
-        embed.set_footer(text=f"Added {format_duration(int(time.time() - track.added_at))} ago")
+            payload['thumbnail'] = {'url': track.thumbnail}
         
-        return embed
+        return discord.Embed.from_dict(payload)
     
     @app_commands.command(name="queue", description="Show the current music queue")
     async def queue(self, interaction: discord.Interaction):
         """Display the current queue."""
-        guild_id = interaction.guild.id
+        guild_id = interaction.guild_id
         queue = music_manager.get_queue(guild_id)
         now_playing = music_manager.get_now_playing(guild_id)
         
@@ -438,18 +667,20 @@ class MusicCommands(commands.Cog):
         
         # Queue section
         if queue:
-            queue_text = []
-            total_duration = 0
-            
-            for i, track in enumerate(queue[:10], 1):  # Show first 10 tracks
-                duration_str = format_duration(track.duration)
-                queue_text.append(f"`{i}.` **{track.title[:50]}{'...' if len(track.title) > 50 else ''}** ({duration_str})")
-                if track.duration:
-                    total_duration += track.duration
+            key = (music_manager.get_queue_version(guild_id), len(queue))
+            cached = self._queue_render_cache.get(guild_id)
+            if cached and cached[0] == key:
+                queue_text = cached[1]
+            else:
+                queue_text = "\n".join(
+                    f"`{i}.` **{track.title[:50]}{'...' if len(track.title) > 50 else ''}** ({track.duration_str})"
+                    for i, track in enumerate(itertools.islice(queue, 10), 1)  # Show first 10 tracks
+                )
+                self._queue_render_cache[guild_id] = (key, queue_text)
             
             embed.add_field(
                 name=f"📝 Up Next ({len(queue)} songs)",
-                value="\n".join(queue_text) if queue_text else "Queue is empty",
+                value=queue_text or "Queue is empty",
                 inline=False
             )
             
@@ -462,7 +693,7 @@ class MusicCommands(commands.Cog):
             
             embed.add_field(
                 name="⏱️ Total Duration",
-                value=format_duration(total_duration),
+                value=format_duration(music_manager.get_queue_duration(guild_id)),
                 inline=True
             )
         else:
@@ -478,62 +709,65 @@ class MusicCommands(commands.Cog):
     @is_dj_or_admin_slash()
     async def skip(self, interaction: discord.Interaction):
         """Skip the current song."""
-        guild_id = interaction.guild.id
-        vc = music_manager.voice_clients.get(guild_id)
+        guild_id = interaction.guild_id
+        voice = music_manager.get_voice_status(guild_id)
         
-        if not vc or not vc.is_playing():
-            await interaction.response.send_message("❌ Nothing is currently playing.", ephemeral=True)
+        if not voice.playing:
+            await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
             return
         
         now_playing = music_manager.get_now_playing(guild_id)
         if now_playing:
-            vc.stop()  # This will trigger the after callback
+            # The after callback re-issues the prefetch for the new queue head
+            self._cancel_prefetch(guild_id)
+            voice.vc.stop()  # This will trigger the after callback
             await interaction.response.send_message(f"⏭️ Skipped **{now_playing.track.title}**")
         else:
-            await interaction.response.send_message("❌ Nothing is currently playing.", ephemeral=True)
+            await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
     
     @app_commands.command(name="pause", description="Pause the current song")
     @is_dj_or_admin_slash()
     async def pause(self, interaction: discord.Interaction):
         """Pause the current song."""
-        guild_id = interaction.guild.id
-        vc = music_manager.voice_clients.get(guild_id)
+        voice = music_manager.get_voice_status(interaction.guild_id)
         
-        if not vc or not vc.is_playing():
-            await interaction.response.send_message("❌ Nothing is currently playing.", ephemeral=True)
+        if not voice.playing:
+            await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
             return
         
-        vc.pause()
-        await interaction.response.send_message("⏸️ Paused playback.")
+        voice.vc.pause()
+        await interaction.response.send_message(MSG_PAUSED)
     
     @app_commands.command(name="resume", description="Resume the current song")
     @is_dj_or_admin_slash()
     async def resume(self, interaction: discord.Interaction):
         """Resume the current song."""
-        guild_id = interaction.guild.id
-        vc = music_manager.voice_clients.get(guild_id)
+        voice = music_manager.get_voice_status(interaction.guild_id)
         
-        if not vc or not vc.is_paused():
-            await interaction.response.send_message("❌ Nothing is currently paused.", ephemeral=True)
+        if not voice.paused:
+            await interaction.response.send_message(MSG_NOTHING_PAUSED, ephemeral=True)
             return
         
-        vc.resume()
-        await interaction.response.send_message("▶️ Resumed playback.")
+        voice.vc.resume()
+        await interaction.response.send_message(MSG_RESUMED)
     
     @app_commands.command(name="stop", description="Stop music and clear the queue")
     @is_dj_or_admin_slash()
     async def stop(self, interaction: discord.Interaction):
         """Stop music and clear queue."""
-        guild_id = interaction.guild.id
-        vc = music_manager.voice_clients.get(guild_id)
+        guild_id = interaction.guild_id
+        vc = music_manager.get_voice_client(guild_id)
+        
+        self._cancel_prefetch(guild_id)
+        self._cancel_retry(guild_id)
         
         if vc:
             vc.stop()
         
         music_manager.clear_queue(guild_id)
-        music_manager.now_playing.pop(guild_id, None)
+        music_manager.clear_now_playing(guild_id)
         
-        await interaction.response.send_message("🛑 Stopped music and cleared the queue.")
+        await interaction.response.send_message(MSG_STOPPED)
     
     @app_commands.command(name="loop", description="Set loop mode")
     @app_commands.describe(mode="Loop mode to set")
@@ -545,7 +779,7 @@ class MusicCommands(commands.Cog):
     @is_dj_or_admin_slash()
     async def loop(self, interaction: discord.Interaction, mode: app_commands.Choice[int]):
         """Set loop mode."""
-        guild_id = interaction.guild.id
+        guild_id = interaction.guild_id
         loop_state = LoopState(mode.value)
         
         music_manager.set_loop_state(guild_id, loop_state)
@@ -556,11 +790,11 @@ class MusicCommands(commands.Cog):
     @is_dj_or_admin_slash()
     async def shuffle(self, interaction: discord.Interaction):
         """Shuffle the queue."""
-        guild_id = interaction.guild.id
+        guild_id = interaction.guild_id
         queue = music_manager.get_queue(guild_id)
         
         if not queue:
-            await interaction.response.send_message("❌ Queue is empty.", ephemeral=True)
+            await interaction.response.send_message(MSG_QUEUE_EMPTY, ephemeral=True)
             return
         
         music_manager.shuffle_queue(guild_id)
@@ -570,24 +804,25 @@ class MusicCommands(commands.Cog):
     @is_dj_or_admin_slash()
     async def clear(self, interaction: discord.Interaction):
         """Clear the queue."""
-        guild_id = interaction.guild.id
+        guild_id = interaction.guild_id
         queue_length = len(music_manager.get_queue(guild_id))
         
+        self._cancel_prefetch(guild_id)
         music_manager.clear_queue(guild_id)
         
         if queue_length > 0:
             await interaction.response.send_message(f"🗑️ Cleared {queue_length} songs from the queue.")
         else:
-            await interaction.response.send_message("❌ Queue is already empty.", ephemeral=True)
+            await interaction.response.send_message(MSG_QUEUE_ALREADY_EMPTY, ephemeral=True)
     
     @app_commands.command(name="nowplaying", description="Show current song info")
     async def nowplaying(self, interaction: discord.Interaction):
         """Show current song information."""
-        guild_id = interaction.guild.id
+        guild_id = interaction.guild_id
         now_playing = music_manager.get_now_playing(guild_id)
         
         if not now_playing:
-            await interaction.response.send_message("❌ Nothing is currently playing.", ephemeral=True)
+            await interaction.response.send_message(MSG_NOTHING_PLAYING, ephemeral=True)
             return
         
         track = now_playing.track
@@ -601,11 +836,10 @@ class MusicCommands(commands.Cog):
         
         # Progress bar
         if track.duration:
-            progress = min(elapsed / track.duration, 1.0)
             progress_bar = ProgressBar.create(int(elapsed), track.duration, length=25)
             embed.add_field(
                 name="Progress",
-                value=f"{format_duration(int(elapsed))} / {format_duration(track.duration)}\n{progress_bar}",
+                value=f"{format_duration(int(elapsed))} / {track.duration_str}\n{progress_bar}",
                 inline=False
             )
         
@@ -625,13 +859,8 @@ class MusicCommands(commands.Cog):
     @app_commands.command(name="bassboost", description="Toggle bass boost for yourself")
     async def bassboost(self, interaction: discord.Interaction):
         """Toggle bass boost."""
-        user_id = interaction.user.id
-        new_state = music_manager.toggle_bass_boost(user_id)
-        
-        emoji = "🔊" if new_state else "🔈"
-        state_text = "enabled" if new_state else "disabled"
-        
-        await interaction.response.send_message(f"{emoji} Bass boost {state_text} for {interaction.user.mention}")
+        new_state = music_manager.toggle_bass_boost(interaction.user.id)
+        await interaction.response.send_message(f"{MSG_BASS_BOOST[new_state]} for {interaction.user.mention}")
     
     @app_commands.command(name="volume", description="Set your personal volume")
     @app_commands.describe(level="Volume level (0.0 to 1.0)")
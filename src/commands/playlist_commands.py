@@ -1,16 +1,16 @@
 import asyncio
+import itertools
 import logging
 import re
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional
-import random
+from typing import Dict, List, Optional
 
 from src.core.music_manager import music_manager, Track
 from src.core.database_manager import db_manager
 from src.utils.checks import is_dj_or_admin_slash
-from src.utils.discord_voice import join_voice_channel, create_audio_source
+from src.utils.discord_voice import join_voice_channel
 from src.utils.youtube import youtube_manager, YouTubeError
 from src.utils.validators import validate_playlist_name
 from src.utils.helpers import format_duration, chunks
@@ -18,24 +18,53 @@ from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Concurrent yt-dlp lookups when warming the cache for a freshly queued playlist
+WARM_CACHE_CONCURRENCY = 4
+
+_CHANNEL_NAME_RE = re.compile(r"[^a-z0-9_.-]")
+
 class PlaylistCommands(commands.Cog):
     """Playlist management commands."""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.playlist_category_name = "🎵 Custom Playlists"
+        self._warm_tasks: Dict[int, asyncio.Task] = {}
+        # guild_id -> playlist category id, so lookups skip the scan over guild.categories
+        self._category_cache: Dict[int, int] = {}
     
     async def cog_load(self):
         """Called when cog is loaded."""
         logger.info("Playlist commands loaded")
     
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        """Forget a deleted playlist category."""
+        if self._category_cache.get(channel.guild.id) == channel.id:
+            self._category_cache.pop(channel.guild.id, None)
+    
+    def _get_playlist_category(self, guild: discord.Guild) -> Optional[discord.CategoryChannel]:
+        """Find the playlist category, scanning the guild's categories only on a cache miss."""
+        category_id = self._category_cache.get(guild.id)
+        if category_id:
+            category = guild.get_channel(category_id)
+            # A renamed category no longer counts as the playlist category
+            if isinstance(category, discord.CategoryChannel) and category.name == self.playlist_category_name:
+                return category
+            self._category_cache.pop(guild.id, None)
+        
+        category = discord.utils.get(guild.categories, name=self.playlist_category_name)
+        if category:
+            self._category_cache[guild.id] = category.id
+        return category
+    
     @app_commands.command(name="setupplaylists", description="Create playlist category (Admin only)")
     @app_commands.checks.has_permissions(manage_channels=True)
     async def setup_playlists(self, interaction: discord.Interaction):
         """Set up playlist category."""
         try:
             guild = interaction.guild
-            category = discord.utils.get(guild.categories, name=self.playlist_category_name)
+            category = self._get_playlist_category(guild)
             
             if category:
                 embed = discord.Embed(
@@ -50,6 +79,7 @@ class PlaylistCommands(commands.Cog):
                 )
             else:
                 category = await guild.create_category(self.playlist_category_name)
+                self._category_cache[guild.id] = category.id
                 embed = discord.Embed(
                     title="✅ Playlist Category Created",
                     description=f"Created category '{category.name}'",
@@ -83,7 +113,7 @@ class PlaylistCommands(commands.Cog):
                 return
             
             guild = interaction.guild
-            category = discord.utils.get(guild.categories, name=self.playlist_category_name)
+            category = self._get_playlist_category(guild)
             
             if not category:
                 await interaction.response.send_message(
@@ -93,7 +123,7 @@ class PlaylistCommands(commands.Cog):
                 return
             
             # Create channel-safe name
-            channel_name = re.sub(r"[^a-z0-9_.-]", "", name.lower().replace(" ", "-"))
+            channel_name = _CHANNEL_NAME_RE.sub("", name.lower().replace(" ", "-"))
             if not channel_name:
                 await interaction.response.send_message("⚠️ Invalid playlist name for channel creation.", ephemeral=True)
                 return
@@ -138,7 +168,7 @@ class PlaylistCommands(commands.Cog):
             )
             intro_embed.add_field(
                 name="How to play",
-                value=f"Use `/playlist {name}` or `/playlist #{channel.name}`",
+                value=f"Use `/playplaylist {name}`",
                 inline=False
             )
             intro_embed.set_footer(text=f"Created by {interaction.user.display_name}")
@@ -158,7 +188,7 @@ class PlaylistCommands(commands.Cog):
             )
             response_embed.add_field(
                 name="How to Use",
-                value=f"Add songs in {channel.mention}, then use `/playlist {name}` to play",
+                value=f"Add songs in {channel.mention}, then use `/playplaylist {name}` to play",
                 inline=False
             )
             
@@ -171,225 +201,6 @@ class PlaylistCommands(commands.Cog):
             logger.error(f"Error creating playlist: {e}")
             await interaction.followup.send("❌ Failed to create playlist.", ephemeral=True)
     
-    @app_commands.command(name="playlist", description="Play songs from a playlist")
-    @app_commands.describe(name="Name of the playlist or #channel-mention")
-    async def play_playlist(self, interaction: discord.Interaction, name: str):
-        """Play a playlist."""
-        try:
-            await interaction.response.defer()
-            
-            guild = interaction.guild
-            user = interaction.user
-            
-            # Ensure user is in voice channel
-            if not user.voice or not user.voice.channel:
-                await interaction.followup.send("❌ You must be in a voice channel to play a playlist.", ephemeral=True)
-                return
-            
-            # Find playlist channel
-            playlist_channel = None
-            
-            # Check if it's a channel mention
-            match = re.match(r"<#(\d+)>", name.strip())
-            if match:
-                channel_id = int(match.group(1))
-                playlist_channel = guild.get_channel(channel_id)
-                if not isinstance(playlist_channel, discord.TextChannel):
-                    await interaction.followup.send("⚠️ Mentioned channel is not a text channel.", ephemeral=True)
-                    return
-            else:
-                # Search by name in database
-                with db_manager:
-                    playlist = db_manager.get_playlist_by_name(guild.id, name)
-                
-                if playlist and playlist.channel_id:
-                    playlist_channel = guild.get_channel(playlist.channel_id)
-                
-                # Fallback: search in playlist category
-                if not playlist_channel:
-                    category = discord.utils.get(guild.categories, name=self.playlist_category_name)
-                    if category:
-                        normalized_name = re.sub(r"[^a-z0-9_.-]", "", name.lower().replace(" ", "-"))
-                        for channel in category.text_channels:
-                            if channel.name == normalized_name or (channel.topic and name in channel.topic):
-                                playlist_channel = channel
-                                break
-            
-            if not playlist_channel:
-                await interaction.followup.send(f"⚠️ Playlist '{name}' not found.", ephemeral=True)
-                return
-            
-            # Read songs from channel
-            songs = []
-            try:
-                async for message in playlist_channel.history(limit=settings.max_playlist_size, oldest_first=True):
-                    if (not message.author.bot and 
-                        message.content and 
-                        not message.content.startswith(('/', '!', '#', '<@', '<#'))):
-                        songs.append(message.content.strip())
-                
-            except discord.Forbidden:
-                await interaction.followup.send(f"❌ No permission to read {playlist_channel.mention}.", ephemeral=True)
-                return
-            
-            if not songs:
-                await interaction.followup.send(f"⚠️ No songs found in playlist {playlist_channel.mention}.", ephemeral=True)
-                return
-            
-            # Join voice channel
-            vc = await join_voice_channel(interaction, user.voice.channel)
-            if not vc:
-                return
-            
-            music_manager.voice_clients[guild.id] = vc
-            
-            # Process and queue songs
-            successful_adds = 0
-            failed_adds = 0
-            
-            for song_query in songs:
-                try:
-                    # Get video info
-                    video_info = await youtube_manager.get_info(song_query, download=False)
-                    
-                    # Create track
-                    track = Track(
-                        query=song_query,
-                        title=video_info['title'],
-                        url=video_info['url'],
-                        duration=video_info['duration'],
-                        thumbnail=video_info['thumbnail'],
-                        uploader=video_info['uploader'],
-                        requested_by=user
-                    )
-                    
-                    # Add to queue
-                    success = await music_manager.add_to_queue(guild.id, track)
-                    if success:
-                        successful_adds += 1
-                    else:
-                        failed_adds += 1
-                        break  # Queue is full
-                
-                except YouTubeError:
-                    failed_adds += 1
-                except Exception as e:
-                    logger.error(f"Error processing song '{song_query}': {e}")
-                    failed_adds += 1
-            
-            # Update playlist play count
-            with db_manager:
-                playlist = db_manager.get_playlist_by_name(guild.id, playlist_channel.name)
-                if playlist:
-                    # Increment play count logic would go here
-                    pass
-            
-            # Send response
-            embed = discord.Embed(
-                title="✅ Playlist Loaded",
-                description=f"Loaded playlist from {playlist_channel.mention}",
-                color=discord.Color.green()
-            )
-            embed.add_field(
-                name="Songs Added",
-                value=f"{successful_adds} songs",
-                inline=True
-            )
-            
-            if failed_adds > 0:
-                embed.add_field(
-                    name="Failed",
-                    value=f"{failed_adds} songs",
-                    inline=True
-                )
-                embed.color = discord.Color.orange()
-            
-            await interaction.followup.send(embed=embed)
-            
-            # Start playing if nothing is currently playing
-            if not music_manager.is_playing(guild.id):
-                await self._start_playlist_playback(guild.id, vc)
-            
-        except Exception as e:
-            logger.error(f"Error in play_playlist: {e}")
-            await interaction.followup.send("❌ An error occurred while loading the playlist.", ephemeral=True)
-    
-    async def _start_playlist_playback(self, guild_id: int, voice_client: discord.VoiceClient):
-        """Start playing the first track in queue."""
-        try:
-            track = music_manager.get_next_track(guild_id)
-            if not track:
-                return
-            
-            # Get user preferences
-            bass_boost = music_manager.get_bass_boost(track.requested_by.id)
-            volume = music_manager.get_user_volume(track.requested_by.id)
-            
-            # Create audio source
-            audio_source = await create_audio_source(track, bass_boost=bass_boost, volume=volume)
-            
-            # Set now playing and start playback
-            music_manager.set_now_playing(guild_id, track, voice_client)
-            
-            def after_callback(error):
-                if error:
-                    logger.error(f"Playback error in guild {guild_id}: {error}")
-                # Schedule next track
-                asyncio.create_task(self._play_next_from_playlist(guild_id))
-            
-            voice_client.play(audio_source, after=after_callback)
-            
-            # Send now playing message
-            guild = self.bot.get_guild(guild_id)
-            if guild and guild.system_channel:
-                embed = discord.Embed(
-                    title="🎶 Now Playing from Playlist",
-                    description=f"**{track.title}**",
-                    color=discord.Color.blue()
-                )
-                embed.add_field(name="Duration", value=format_duration(track.duration), inline=True)
-                embed.add_field(name="Requested by", value=track.requested_by.mention, inline=True)
-                
-                if track.thumbnail:
-                    embed.set_thumbnail(url=track.thumbnail)
-                
-                await guild.system_channel.send(embed=embed)
-            
-        except Exception as e:
-            logger.error(f"Error starting playlist playback: {e}")
-    
-    async def _play_next_from_playlist(self, guild_id: int):
-        """Play next track from playlist queue."""
-        try:
-            track = music_manager.get_next_track(guild_id)
-            if not track:
-                return
-            
-            vc = music_manager.voice_clients.get(guild_id)
-            if not vc or not vc.is_connected():
-                return
-            
-            # Get user preferences
-            bass_boost = music_manager.get_bass_boost(track.requested_by.id)
-            volume = music_manager.get_user_volume(track.requested_by.id)
-            
-            # Create audio source
-            audio_source = await create_audio_source(track, bass_boost=bass_boost, volume=volume)
-            
-            # Set now playing and start playback
-            music_manager.set_now_playing(guild_id, track, vc)
-            
-            def after_callback(error):
-                if error:
-                    logger.error(f"Playback error in guild {guild_id}: {error}")
-                # Schedule next track
-                asyncio.create_task(self._play_next_from_playlist(guild_id))
-            
-            vc.play(audio_source, after=after_callback)
-            
-        except Exception as e:
-            logger.error(f"Error in _play_next_from_playlist: {e}")
-
     @app_commands.command(name="myplaylists", description="View your playlists")
     async def my_playlists(self, interaction: discord.Interaction):
         """Show user's personal playlists."""
@@ -468,14 +279,9 @@ class PlaylistCommands(commands.Cog):
             song_info = None
             
             if query:
-                # Search for the song
+                # Single metadata lookup, served from the query cache on repeats
                 try:
-                    search_results = await youtube_manager.search(query, limit=1)
-                    if search_results:
-                        song_info = search_results[0]
-                    else:
-                        await interaction.followup.send(f"❌ No results found for '{query}'.", ephemeral=True)
-                        return
+                    song_info = await youtube_manager.get_info(query, download=False)
                 except YouTubeError as e:
                     await interaction.followup.send(f"❌ Search failed: {str(e)}", ephemeral=True)
                     return
@@ -556,17 +362,19 @@ class PlaylistCommands(commands.Cog):
                 return
             
             # Join voice channel
-            from src.utils.discord_voice import join_voice_channel
             vc = await join_voice_channel(interaction, interaction.user.voice.channel)
             if not vc:
                 return
             
-            # Add all songs to queue
-            added_count = 0
+            if music_manager.voice_clients.get(guild_id) is not vc:
+                music_manager.voice_clients[guild_id] = vc
+            
+            # Add all songs to queue in one batch
+            tracks = []
             for song in songs:
                 try:
                     # Create track object
-                    track = Track(
+                    tracks.append(Track(
                         query=song.url,
                         title=song.title,
                         url=song.url,
@@ -574,23 +382,22 @@ class PlaylistCommands(commands.Cog):
                         thumbnail="",  # Could enhance this later
                         uploader="",
                         requested_by=interaction.user
-                    )
-                    
-                    # Add to queue
-                    if await music_manager.add_to_queue(guild_id, track):
-                        added_count += 1
-                    
+                    ))
                 except Exception as e:
                     logger.warning(f"Failed to add song {song.title} to queue: {e}")
                     continue
             
+            added_count = await music_manager.add_many_to_queue(guild_id, tracks)
+            
             if added_count == 0:
                 await interaction.followup.send("❌ Failed to add any songs from the playlist.", ephemeral=True)
                 return
             
-            # Start playing if not already playing
-            if not music_manager.is_playing(guild_id):
-                await self._start_playback(guild_id)
+            # Start playing, or prefetch the new tracks if something is already playing
+            await self._start_playback(guild_id)
+            
+            # Resolve the rest of the playlist in the background so later tracks start quickly
+            self._schedule_warm_cache(guild_id, tracks[1:added_count])
             
             # Create response embed
             embed = discord.Embed(
@@ -757,14 +564,14 @@ class PlaylistCommands(commands.Cog):
             
             # Show first 10 songs
             if songs:
-                song_list = []
-                for i, song in enumerate(songs[:10], 1):
-                    duration_str = format_duration(song.duration) if song.duration else "Unknown"
-                    song_list.append(f"`{i:2}.` **{song.title}** ({duration_str})")
+                song_list = "\n".join(
+                    f"`{i:2}.` **{song.title}** ({format_duration(song.duration) if song.duration else 'Unknown'})"
+                    for i, song in enumerate(itertools.islice(songs, 10), 1)
+                )
                 
                 embed.add_field(
                     name="Songs" + (f" (showing first 10 of {len(songs)})" if len(songs) > 10 else ""),
-                    value="\n".join(song_list),
+                    value=song_list,
                     inline=False
                 )
             else:
@@ -780,50 +587,64 @@ class PlaylistCommands(commands.Cog):
             logger.error(f"Error showing playlist info: {e}")
             await interaction.response.send_message("❌ Failed to load playlist information.", ephemeral=True)
 
-    async def _start_playback(self, guild_id: int):
-        """Helper method to start playback."""
+    def _format_playlist_entry(self, guild: discord.Guild, playlist) -> str:
+        """Format one playlist for the /listplaylists embed."""
+        channel = guild.get_channel(playlist.channel_id) if playlist.channel_id else None
+        owner = guild.get_member(playlist.owner_id)
+        
+        status = "✅" if channel else "❌"
+        owner_name = owner.display_name if owner else "Unknown"
+        
+        return (
+            f"{status} **{playlist.name}**\n"
+            f"   Owner: {owner_name} | Songs: {len(playlist.songs)}\n"
+            f"   Channel: {channel.mention if channel else 'Deleted'}"
+        )
+    
+    def _schedule_warm_cache(self, guild_id: int, tracks: List[Track]):
+        """Start warming the query cache for queued playlist tracks."""
+        # Downloads are fetched at play time; pre-downloading a whole playlist is too heavy
+        if settings.download_enabled or not tracks:
+            return
+        
+        previous = self._warm_tasks.pop(guild_id, None)
+        if previous and not previous.done():
+            previous.cancel()
+        self._warm_tasks[guild_id] = asyncio.create_task(self._warm_cache(guild_id, tracks))
+    
+    async def _warm_cache(self, guild_id: int, tracks: List[Track]):
+        """Resolve stream info for tracks so playback hits the query cache."""
+        sem = asyncio.Semaphore(WARM_CACHE_CONCURRENCY)
+        
+        async def warm(track: Track):
+            async with sem:
+                try:
+                    await youtube_manager.get_info(track.query, download=False)
+                except Exception as e:
+                    logger.debug("Cache warm failed for %s in guild %s: %s", track.title, guild_id, e)
+        
         try:
-            queue = music_manager.get_queue(guild_id)
-            if not queue:
-                return
-            
-            vc = music_manager.voice_clients.get(guild_id)
-            if not vc or not vc.is_connected():
-                return
-                
-            # Check if already playing
-            if music_manager.is_playing(guild_id):
-                return
-            
-            # Get next track
-            track = music_manager.get_next_track(guild_id)
-            if not track:
-                return
-            
-            # Import here to avoid circular imports
-            from src.utils.discord_voice import create_audio_source
-            
-            # Get user preferences
-            bass_boost = music_manager.get_bass_boost(track.requested_by.id)
-            volume = music_manager.get_user_volume(track.requested_by.id)
-            
-            # Create audio source
-            audio_source = await create_audio_source(track, bass_boost=bass_boost, volume=volume)
-            
-            # Set now playing and start playback
-            music_manager.set_now_playing(guild_id, track, vc)
-            
-            def after_callback(error):
-                if error:
-                    logger.error(f"Playback error in guild {guild_id}: {error}")
-                # Could add auto-next logic here if needed
-            
-            vc.play(audio_source, after=after_callback)
-            
-        except Exception as e:
-            logger.error(f"Error starting playback: {e}")
+            await asyncio.gather(*(warm(track) for track in tracks))
+            logger.debug(f"Warmed cache for {len(tracks)} playlist tracks in guild {guild_id}")
+        finally:
+            if self._warm_tasks.get(guild_id) is asyncio.current_task():
+                self._warm_tasks.pop(guild_id, None)
+    
+    async def _start_playback(self, guild_id: int):
+        """Start playback through the music cog so queue handling lives in one place."""
+        music_cog = self.bot.get_cog('MusicCommands')
+        if not music_cog:
+            logger.error("MusicCommands cog not loaded, cannot start playlist playback")
+            return
+        
+        if music_manager.is_playing(guild_id):
+            # The prefetch window was sized before these tracks arrived; refill it now
+            music_cog._schedule_prefetch(guild_id)
+            return
+        
+        # Failed tracks are retried with a delay, which the interaction shouldn't wait on
+        music_cog._spawn_play_next(guild_id)
 
-            
     @app_commands.command(name="listplaylists", description="List all playlists in this server")
     async def list_playlists(self, interaction: discord.Interaction):
         """List all playlists in the server."""
@@ -852,28 +673,14 @@ class PlaylistCommands(commands.Cog):
             
             # Group playlists for display
             for chunk in chunks(playlists, 10):
-                playlist_text = []
-                for playlist in chunk:
-                    channel = guild.get_channel(playlist.channel_id) if playlist.channel_id else None
-                    owner = guild.get_member(playlist.owner_id)
-                    
-                    status = "✅" if channel else "❌"
-                    owner_name = owner.display_name if owner else "Unknown"
-                    
-                    playlist_text.append(
-                        f"{status} **{playlist.name}**\n"
-                        f"   Owner: {owner_name} | Songs: {len(playlist.songs)}\n"
-                        f"   Channel: {channel.mention if channel else 'Deleted'}"
-                    )
-                
-                if playlist_text:
+                if chunk:
                     embed.add_field(
                         name="Playlists",
-                        value="\n\n".join(playlist_text),
+                        value="\n\n".join(self._format_playlist_entry(guild, playlist) for playlist in chunk),
                         inline=False
                     )
             
-            embed.set_footer(text="Use /playlist <name> to play a playlist")
+            embed.set_footer(text="Use /playplaylist <name> to play a playlist")
             
             await interaction.response.send_message(embed=embed)
             
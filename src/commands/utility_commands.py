@@ -1,3 +1,5 @@
+import asyncio
+import datetime
 import logging
 import time
 import psutil
@@ -9,6 +11,7 @@ from typing import Optional
 from src.core.music_manager import music_manager
 from src.core.database_manager import db_manager
 from src.utils.youtube import youtube_manager
+from src.utils.non_disruptive_voice import voice_manager
 from src.utils.helpers import format_duration, time_ago
 from config.settings import settings
 
@@ -76,16 +79,15 @@ class UtilityCommands(commands.Cog):
     @app_commands.command(name="status", description="Check voice connection status")
     async def voice_status(self, interaction: discord.Interaction):
         """Show current voice connection status and peak hour information."""
-        from src.utils.non_disruptive_voice import voice_manager
-        
         guild_id = interaction.guild.id
         status = voice_manager.get_connection_status(guild_id)
         
         embed = discord.Embed(title="🎵 Voice Connection Status", color=discord.Color.blue())
         
-        if interaction.guild.voice_client and interaction.guild.voice_client.is_connected():
+        vc = interaction.guild.voice_client
+        if vc and vc.is_connected():
             embed.add_field(name="Status", value="🟢 Connected", inline=True)
-            embed.add_field(name="Channel", value=interaction.guild.voice_client.channel.mention, inline=True)
+            embed.add_field(name="Channel", value=vc.channel.mention, inline=True)
         elif status['status'] == 'queued':
             embed.add_field(name="Status", value="🟡 Queued (Peak Hours)", inline=True)
             embed.add_field(name="Position", value=f"Attempt {status['attempts']}/20", inline=True)
@@ -94,7 +96,6 @@ class UtilityCommands(commands.Cog):
             embed.add_field(name="Status", value="🔴 Disconnected", inline=True)
         
         # Add peak hour information
-        import datetime
         current_hour = datetime.datetime.now().hour
         if 12 <= current_hour <= 20:
             embed.add_field(
@@ -110,7 +111,7 @@ class UtilityCommands(commands.Cog):
         """Show bot information."""
         try:
             # Get system info
-            cpu_usage = psutil.cpu_percent(interval=1)
+            cpu_usage = await asyncio.to_thread(psutil.cpu_percent, interval=1)
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             
@@ -327,14 +328,15 @@ class UtilityCommands(commands.Cog):
                 await interaction.followup.send("No results found.")
                 return
 
-            # Present results
-            embed = discord.Embed(title="🎵 YouTube Search Results", color=discord.Color.blue())
-            for idx, video in enumerate(results, start=1):
-                embed.add_field(
-                    name=f"Result {idx}",
-                    value=f"[{video.title}]({video.url})\nDuration: {format_duration(video.duration)}",
-                    inline=False
-                )
+            # Present results; search already formatted each duration
+            embed = discord.Embed(
+                title="🎵 YouTube Search Results",
+                description="\n".join(
+                    f"**{idx}.** [{video['label']}]({video['url']}) • {video['duration_str']}"
+                    for idx, video in enumerate(results, start=1)
+                ),
+                color=discord.Color.blue()
+            )
 
             await interaction.followup.send(embed=embed)
 
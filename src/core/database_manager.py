@@ -63,6 +63,10 @@ class DatabaseManager:
             logger.info(f"Created new user record: {username} ({user_id})")
         return user
     
+    def get_user(self, user_id: int) -> Optional[User]:
+        """Get a user record without creating one."""
+        return self.session.query(User).filter(User.id == user_id).first()
+    
     def update_user_settings(self, user_id: int, **kwargs) -> bool:
         """Update user settings."""
         try:
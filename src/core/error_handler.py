@@ -1,7 +1,8 @@
 import logging
 import traceback
 import discord
-from typing import Optional
+from collections import deque
+from typing import Deque, Optional
 from datetime import datetime
 from discord.ext import commands
 
@@ -16,7 +17,8 @@ class ErrorHandler:
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.error_count = 0
-        self.recent_errors = []
+        # Bounded; the oldest error drops off in O(1)
+        self.recent_errors: Deque[dict] = deque(maxlen=100)
     
     async def handle_command_error(self, ctx: commands.Context, error: Exception) -> bool:
         """Handle command errors."""
@@ -28,12 +30,11 @@ class ErrorHandler:
             'command': ctx.command.name if ctx.command else 'Unknown',
             'guild_id': ctx.guild.id if ctx.guild else None,
             'user_id': ctx.author.id,
-            'traceback': traceback.format_exc()
+            # Filled in only for unhandled errors; cooldowns and permission checks skip the formatting
+            'traceback': None
         }
         
         self.recent_errors.append(error_info)
-        if len(self.recent_errors) > 100:
-            self.recent_errors.pop(0)
         
         # Log to database
         if error_info['guild_id']:
@@ -99,7 +100,8 @@ class ErrorHandler:
         
         else:
             # Log unexpected errors
-            logger.error(f"Unhandled command error: {error}", exc_info=True)
+            error_info['traceback'] = ''.join(traceback.format_exception(error))
+            logger.error(f"Unhandled command error: {error}", exc_info=error)
             await self._send_error_message(
                 ctx,
                 "❌ An unexpected error occurred. The developers have been notified.",
@@ -117,12 +119,10 @@ class ErrorHandler:
             'command': interaction.command.name if interaction.command else 'Unknown',
             'guild_id': interaction.guild.id if interaction.guild else None,
             'user_id': interaction.user.id,
-            'traceback': traceback.format_exc()
+            'traceback': None  # Set below for unhandled errors only
         }
         
         self.recent_errors.append(error_info)
-        if len(self.recent_errors) > 100:
-            self.recent_errors.pop(0)
         
         # Log to database
         if error_info['guild_id']:
@@ -157,7 +157,8 @@ class ErrorHandler:
             return True
         
         else:
-            logger.error(f"Unhandled interaction error: {error}", exc_info=True)
+            error_info['traceback'] = ''.join(traceback.format_exception(error))
+            logger.error(f"Unhandled interaction error: {error}", exc_info=error)
             await self._send_interaction_error(
                 interaction,
                 "❌ An unexpected error occurred. The developers have been notified."
@@ -194,4 +195,4 @@ class ErrorHandler:
     
     def get_recent_errors(self, limit: int = 10) -> list:
         """Get recent errors."""
-        return self.recent_errors[-limit:]
\ No newline at end of file
+        return list(self.recent_errors)[-limit:]
\ No newline at end of file
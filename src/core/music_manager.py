@@ -2,23 +2,28 @@ import asyncio
 import discord
 import time
 import random
+import itertools
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Deque, Dict, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple
 from enum import Enum
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import defaultdict, deque
 
 from config.settings import settings
 from src.core.database_manager import db_manager
+from src.utils.helpers import format_duration
 
 logger = logging.getLogger(__name__)
 
+# Activity timestamps closer together than this are coalesced into one write
+ACTIVITY_WRITE_INTERVAL = 1.0
+
 class LoopState(Enum):
     OFF = 0
     SINGLE = 1
     QUEUE = 2
 
-@dataclass
+@dataclass(slots=True)
 class Track:
     """Represents a track in the queue."""
     query: str
@@ -29,31 +34,121 @@ class Track:
     uploader: str
     requested_by: discord.User
     added_at: float = field(default_factory=time.time)
+    # Resolved stream info filled in ahead of playback by the prefetcher
+    prepared_info: Optional[dict] = field(default=None, repr=False, compare=False)
+    duration_str: str = field(init=False, repr=False, compare=False)
+    requester_id: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Formatted once at insert time instead of on every queue render
+        self.duration_str = format_duration(self.duration)
+        self.requester_id = self.requested_by.id
+    
+    def fresh_prepared_info(self, max_age: float) -> Optional[dict]:
+        """Get prepared info if yt-dlp resolved it less than max_age seconds ago."""
+        # Aged from the resolve, not from when it was attached; a cache hit may already be hours old
+        info = self.prepared_info
+        if info is not None and time.time() - info.get('resolved_at', 0) < max_age:
+            return info
+        return None
 
-@dataclass
+@dataclass(slots=True)
+class UserPrefs:
+    """Cached per-user playback preferences."""
+    volume: float = field(default_factory=lambda: settings.default_volume)
+    dirty: bool = False
+
+@dataclass(slots=True)
 class NowPlaying:
     """Represents currently playing track."""
     track: Track
     start_time: float
     voice_client: discord.VoiceClient
 
+@dataclass(slots=True)
+class GuildState:
+    """Per-guild playback state, kept together so hot paths do a single lookup."""
+    queue: Deque[Track] = field(default_factory=deque)
+    now_playing: Optional[NowPlaying] = None
+    loop_state: LoopState = LoopState.OFF
+    # Next-track function, specialized when the loop state changes
+    next_fn: Optional[Callable[['GuildState'], Optional[Track]]] = None
+    # Bumped on every queue mutation so renders/aggregates can be cached per version
+    queue_version: int = 0
+    queue_duration: Optional[Tuple[int, int]] = None
+
+class VoiceStatus(NamedTuple):
+    """Snapshot of a guild's voice client, taken in one lookup."""
+    vc: Optional[discord.VoiceClient]
+    connected: bool
+    playing: bool
+    paused: bool
+
+_NO_VOICE = VoiceStatus(None, False, False, False)
+
+class _GuildStateView(Mapping):
+    """Read-only guild_id -> field mapping over MusicManager.states."""
+    
+    def __init__(self, states: Dict[int, GuildState], attr: str, skip_none: bool = False):
+        self._states = states
+        self._attr = attr
+        self._skip_none = skip_none
+    
+    def __getitem__(self, guild_id: int):
+        value = getattr(self._states[guild_id], self._attr)
+        if value is None and self._skip_none:
+            raise KeyError(guild_id)
+        return value
+    
+    def __iter__(self) -> Iterator[int]:
+        for guild_id, state in self._states.items():
+            if not self._skip_none or getattr(state, self._attr) is not None:
+                yield guild_id
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
 class MusicManager:
     """Enhanced music manager with database integration and advanced features."""
     
     def __init__(self):
         # Core music state
-        self.queues: Dict[int, List[Track]] = defaultdict(list)
+        self.states: Dict[int, GuildState] = {}
+        # Entries are popped by clear_guild_state when the bot leaves voice
         self.voice_clients: Dict[int, discord.VoiceClient] = {}
-        self.now_playing: Dict[int, NowPlaying] = {}
-        self.loop_states: Dict[int, LoopState] = defaultdict(lambda: LoopState.OFF)
+        # Serializes track transitions; kept across clear_guild_state so a
+        # transition in flight never races one that starts on a fresh lock
+        self.play_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        # Read-only per-field views for monitoring and stats code
+        self.queues: Mapping[int, Deque[Track]] = _GuildStateView(self.states, 'queue')
+        self.now_playing: Mapping[int, NowPlaying] = _GuildStateView(self.states, 'now_playing', skip_none=True)
+        self.loop_states: Mapping[int, LoopState] = _GuildStateView(self.states, 'loop_state')
+        
+        self._next_fn_by_state: Dict[LoopState, Callable[[GuildState], Optional[Track]]] = {
+            LoopState.OFF: self._next_normal,
+            LoopState.SINGLE: self._next_single,
+            LoopState.QUEUE: self._next_queue
+        }
+        # Drawn from a global counter so a version is never reused, even after clear_guild_state
+        self._queue_version_counter = itertools.count(1)
         
-        # User preferences
-        self.user_bass_boost: Dict[int, bool] = defaultdict(bool)
-        self.user_volumes: Dict[int, float] = defaultdict(lambda: settings.default_volume)
+        # User preferences, loaded lazily and persisted by flush_user_prefs
+        self._user_prefs: Dict[int, UserPrefs] = {}
+        # Users with bass boost on; membership is checked on every track start
+        self.bass_boosted: Set[int] = set()
+        # DJ role per guild, read on every DJ-gated command; set_dj_role keeps it current
+        self._dj_role_cache: Dict[int, Optional[int]] = {}
         
         # Activity tracking
         self.last_activity: Dict[int, float] = defaultdict(time.time)
+        # Monotonic time of the last activity write, used for throttling and idle deadlines
+        self._activity_clock: Dict[int, float] = {}
         self.search_results: Dict[int, List[dict]] = {}
+        # Per-guild idle timers, re-armed on activity instead of polled
+        self._idle_handler: Optional[Callable[[int], Awaitable[None]]] = None
+        self._idle_handles: Dict[int, asyncio.TimerHandle] = {}
+        self._idle_tasks: Set[asyncio.Task] = set()
         
         # Performance metrics
         self.metrics = {
@@ -68,81 +163,217 @@ class MusicManager:
     # Guild State Management
     def update_last_activity(self, guild_id: int):
         """Update last activity timestamp for a guild."""
-        self.last_activity[guild_id] = time.time()
+        now = time.monotonic()
+        if now - self._activity_clock.get(guild_id, float('-inf')) >= ACTIVITY_WRITE_INTERVAL:
+            self._activity_clock[guild_id] = now
+            self.last_activity[guild_id] = time.time()
+        # A pending timer re-checks last_activity when it fires, so activity
+        # bursts only write the timestamp instead of re-arming every time
+        if guild_id not in self._idle_handles:
+            self._arm_idle_timer(guild_id)
+    
+    def set_idle_handler(self, handler: Optional[Callable[[int], Awaitable[None]]]):
+        """Register the coroutine called once a guild has been idle for idle_timeout."""
+        self._idle_handler = handler
+        if handler is None:
+            for handle in self._idle_handles.values():
+                handle.cancel()
+            self._idle_handles.clear()
+    
+    def _arm_idle_timer(self, guild_id: int, delay: Optional[float] = None):
+        """Start a guild's idle timer, defaulting to the full idle timeout."""
+        if self._idle_handler is None:
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        
+        if delay is None:
+            delay = settings.idle_timeout
+        self._idle_handles[guild_id] = loop.call_later(delay, self._on_idle, guild_id)
+    
+    def _on_idle(self, guild_id: int):
+        self._idle_handles.pop(guild_id, None)
+        if self._idle_handler is None:
+            return
+        
+        # Activity since the timer was armed pushes the deadline back
+        remaining = self._activity_clock.get(guild_id, 0) + settings.idle_timeout - time.monotonic()
+        if remaining > 0:
+            self._arm_idle_timer(guild_id, remaining)
+            return
+        
+        task = asyncio.create_task(self._idle_handler(guild_id))
+        self._idle_tasks.add(task)
+        task.add_done_callback(self._idle_tasks.discard)
     
     def get_last_activity(self, guild_id: int) -> float:
         """Get last activity timestamp for a guild."""
         return self.last_activity.get(guild_id, 0)
     
+    def get_voice_client(self, guild_id: int) -> Optional[discord.VoiceClient]:
+        """Get the voice client for a guild, or None if it is not connected."""
+        vc = self.voice_clients.get(guild_id)
+        if vc and vc.is_connected():
+            return vc
+        return None
+    
+    def _state(self, guild_id: int) -> GuildState:
+        """Get the state for a guild, creating it on first write."""
+        state = self.states.get(guild_id)
+        if state is None:
+            state = self.states[guild_id] = GuildState(next_fn=self._next_normal)
+        return state
+    
     def clear_guild_state(self, guild_id: int):
         """Clear all state for a guild."""
-        self.queues.pop(guild_id, None)
+        self.states.pop(guild_id, None)
         self.voice_clients.pop(guild_id, None)
-        self.now_playing.pop(guild_id, None)
-        self.loop_states.pop(guild_id, None)
         self.search_results.pop(guild_id, None)
         self.last_activity.pop(guild_id, None)
+        self._activity_clock.pop(guild_id, None)
+        handle = self._idle_handles.pop(guild_id, None)
+        if handle:
+            handle.cancel()
         logger.info(f"Cleared guild state for {guild_id}")
     
     # Queue Management
+    def _queue_changed(self, state: GuildState):
+        """Mark a guild's queue as modified."""
+        state.queue_version = next(self._queue_version_counter)
+    
+    def get_queue_version(self, guild_id: int) -> int:
+        """Get the current version of a guild's queue."""
+        state = self.states.get(guild_id)
+        return state.queue_version if state else 0
+    
     async def add_to_queue(self, guild_id: int, track: Track) -> bool:
         """Add a track to the queue."""
         try:
             guild_settings = db_manager.get_guild_settings(guild_id)
             max_queue = guild_settings.max_queue_size if guild_settings else settings.max_queue_size
             
-            if len(self.queues[guild_id]) >= max_queue:
+            state = self._state(guild_id)
+            if len(state.queue) >= max_queue:
                 return False
             
-            self.queues[guild_id].append(track)
+            state.queue.append(track)
+            self._queue_changed(state)
             self.update_last_activity(guild_id)
             self.metrics['queue_adds'] += 1
             
-            logger.debug(f"Added track to queue: {track.title} in guild {guild_id}")
+            logger.debug("Added track to queue: %s in guild %s", track.title, guild_id)
             return True
         except Exception as e:
             logger.error(f"Error adding track to queue: {e}")
             self.metrics['errors'] += 1
             return False
     
-    def get_queue(self, guild_id: int) -> List[Track]:
+    async def add_many_to_queue(self, guild_id: int, tracks: List[Track]) -> int:
+        """Add several tracks to the queue at once, returning how many were added."""
+        try:
+            guild_settings = db_manager.get_guild_settings(guild_id)
+            max_queue = guild_settings.max_queue_size if guild_settings else settings.max_queue_size
+            
+            state = self._state(guild_id)
+            to_add = tracks[:max(0, max_queue - len(state.queue))]
+            if not to_add:
+                return 0
+            
+            state.queue.extend(to_add)
+            self._queue_changed(state)
+            self.update_last_activity(guild_id)
+            self.metrics['queue_adds'] += len(to_add)
+            
+            logger.debug(f"Added {len(to_add)} tracks to queue in guild {guild_id}")
+            return len(to_add)
+        except Exception as e:
+            logger.error(f"Error adding tracks to queue: {e}")
+            self.metrics['errors'] += 1
+            return 0
+    
+    def get_queue(self, guild_id: int) -> Deque[Track]:
         """Get the queue for a guild."""
-        return self.queues.get(guild_id, [])
+        state = self.states.get(guild_id)
+        return state.queue if state else deque()
     
     def get_next_track(self, guild_id: int) -> Optional[Track]:
         """Get the next track from the queue without removing it."""
-        queue = self.queues.get(guild_id, [])
-        return queue[0] if queue else None
+        state = self.states.get(guild_id)
+        return state.queue[0] if state and state.queue else None
+    
+    def _pop_head(self, state: GuildState) -> Optional[Track]:
+        if state.queue:
+            self._queue_changed(state)
+            return state.queue.popleft()
+        return None
     
     def pop_next_track(self, guild_id: int) -> Optional[Track]:
         """Remove and return the next track from the queue."""
-        queue = self.queues.get(guild_id, [])
-        if queue:
-            track = queue.pop(0)
-            logger.debug(f"Popped track from queue: {track.title} in guild {guild_id}")
+        state = self.states.get(guild_id)
+        track = self._pop_head(state) if state else None
+        if track:
+            logger.debug("Popped track from queue: %s in guild %s", track.title, guild_id)
             self.update_last_activity(guild_id)
-            return track
-        return None
+        return track
+    
+    def advance_queue(self, guild_id: int) -> Optional[Track]:
+        """Get the track to play next, honouring the guild's loop state."""
+        state = self.states.get(guild_id)
+        if state is None:
+            return None
+        
+        track = state.next_fn(state)
+        if track:
+            self.update_last_activity(guild_id)
+        return track
+    
+    def _next_normal(self, state: GuildState) -> Optional[Track]:
+        return self._pop_head(state)
+    
+    def _next_single(self, state: GuildState) -> Optional[Track]:
+        # Replay the current track without touching the queue
+        return state.now_playing.track if state.now_playing else self._pop_head(state)
+    
+    def _next_queue(self, state: GuildState) -> Optional[Track]:
+        # Move the current track to the end of the queue
+        if state.now_playing:
+            state.queue.append(state.now_playing.track)
+            self._queue_changed(state)
+        return self._pop_head(state)
     
     def shuffle_queue(self, guild_id: int):
         """Shuffle the queue for a guild."""
-        if guild_id in self.queues:
-            random.shuffle(self.queues[guild_id])
+        state = self.states.get(guild_id)
+        if state:
+            # Shuffle a list copy; indexing into the middle of a deque is O(n)
+            tracks = list(state.queue)
+            random.shuffle(tracks)
+            state.queue = deque(tracks)
+            self._queue_changed(state)
             self.update_last_activity(guild_id)
             logger.debug(f"Shuffled queue for guild {guild_id}")
     
     def clear_queue(self, guild_id: int):
         """Clear the queue for a guild."""
-        self.queues[guild_id] = []
+        state = self.states.get(guild_id)
+        if state:
+            state.queue.clear()
+            self._queue_changed(state)
         self.update_last_activity(guild_id)
         logger.debug(f"Cleared queue for guild {guild_id}")
     
     def remove_track(self, guild_id: int, index: int) -> bool:
         """Remove a track from the queue by index."""
         try:
-            queue = self.queues.get(guild_id, [])
+            state = self.states.get(guild_id)
+            queue = state.queue if state else ()
             if 0 <= index < len(queue):
-                removed = queue.pop(index)
+                removed = queue[index]
+                del queue[index]
+                self._queue_changed(state)
                 self.update_last_activity(guild_id)
                 logger.debug(f"Removed track from queue: {removed.title}")
                 return True
@@ -154,10 +385,13 @@ class MusicManager:
     def move_track(self, guild_id: int, from_index: int, to_index: int) -> bool:
         """Move a track in the queue."""
         try:
-            queue = self.queues.get(guild_id, [])
+            state = self.states.get(guild_id)
+            queue = state.queue if state else ()
             if 0 <= from_index < len(queue) and 0 <= to_index < len(queue):
-                track = queue.pop(from_index)
+                track = queue[from_index]
+                del queue[from_index]
                 queue.insert(to_index, track)
+                self._queue_changed(state)
                 self.update_last_activity(guild_id)
                 return True
             return False
@@ -168,18 +402,32 @@ class MusicManager:
     # Playback Control
     def set_now_playing(self, guild_id: int, track: Track, voice_client: discord.VoiceClient):
         """Set the currently playing track."""
-        self.now_playing[guild_id] = NowPlaying(
+        self._state(guild_id).now_playing = NowPlaying(
             track=track,
             start_time=time.time(),
             voice_client=voice_client
         )
         self.update_last_activity(guild_id)
         self.metrics['songs_played'] += 1
-        logger.debug(f"Now playing: {track.title} in guild {guild_id}")
+        logger.debug("Now playing: %s in guild %s", track.title, guild_id)
     
     def get_now_playing(self, guild_id: int) -> Optional[NowPlaying]:
         """Get the currently playing track."""
-        return self.now_playing.get(guild_id)
+        state = self.states.get(guild_id)
+        return state.now_playing if state else None
+    
+    def clear_now_playing(self, guild_id: int):
+        """Clear the currently playing track."""
+        state = self.states.get(guild_id)
+        if state:
+            state.now_playing = None
+    
+    def get_voice_status(self, guild_id: int) -> VoiceStatus:
+        """Get the connected voice client for a guild with its playback flags."""
+        vc = self.voice_clients.get(guild_id)
+        if not vc or not vc.is_connected():
+            return _NO_VOICE
+        return VoiceStatus(vc, True, vc.is_playing(), vc.is_paused())
     
     def is_playing(self, guild_id: int) -> bool:
         """Check if music is currently playing."""
@@ -194,55 +442,114 @@ class MusicManager:
     # Loop Control
     def get_loop_state(self, guild_id: int) -> LoopState:
         """Get the loop state for a guild."""
-        return self.loop_states.get(guild_id, LoopState.OFF)
+        state = self.states.get(guild_id)
+        return state.loop_state if state else LoopState.OFF
     
     def set_loop_state(self, guild_id: int, state: LoopState):
         """Set the loop state for a guild."""
-        self.loop_states[guild_id] = state
+        guild_state = self._state(guild_id)
+        guild_state.loop_state = state
+        guild_state.next_fn = self._next_fn_by_state[state]
         self.update_last_activity(guild_id)
         logger.debug(f"Set loop state to {state.name} for guild {guild_id}")
     
     # User Preferences
+    def _get_user_prefs(self, user_id: int) -> UserPrefs:
+        """Get cached preferences for a user, loading them on first access."""
+        prefs = self._user_prefs.get(user_id)
+        if prefs is None:
+            prefs = UserPrefs()
+            try:
+                user = db_manager.get_user(user_id)
+                if user:
+                    if getattr(user, 'bass_boost_enabled', False):
+                        self.bass_boosted.add(user_id)
+                    volume = getattr(user, 'default_volume', None)
+                    if volume is not None:
+                        prefs.volume = volume
+            except Exception as e:
+                logger.error(f"Error loading preferences for user {user_id}: {e}")
+            self._user_prefs[user_id] = prefs
+        return prefs
+    
     def toggle_bass_boost(self, user_id: int) -> bool:
         """Toggle bass boost for a user."""
-        self.user_bass_boost[user_id] = not self.user_bass_boost[user_id]
-        
-        # Update in database
-        db_manager.update_user_settings(user_id, bass_boost_enabled=self.user_bass_boost[user_id])
+        self._get_user_prefs(user_id).dirty = True
+        if user_id in self.bass_boosted:
+            self.bass_boosted.discard(user_id)
+            enabled = False
+        else:
+            self.bass_boosted.add(user_id)
+            enabled = True
         
-        logger.debug(f"Bass boost {'enabled' if self.user_bass_boost[user_id] else 'disabled'} for user {user_id}")
-        return self.user_bass_boost[user_id]
+        logger.debug("Bass boost %s for user %s", 'enabled' if enabled else 'disabled', user_id)
+        return enabled
     
     def get_bass_boost(self, user_id: int) -> bool:
         """Get bass boost setting for a user."""
-        return self.user_bass_boost.get(user_id, False)
+        if user_id not in self._user_prefs:
+            self._get_user_prefs(user_id)
+        return user_id in self.bass_boosted
     
     def set_user_volume(self, user_id: int, volume: float):
         """Set volume preference for a user."""
         volume = max(0.0, min(1.0, volume))  # Clamp between 0 and 1
-        self.user_volumes[user_id] = volume
+        prefs = self._get_user_prefs(user_id)
+        prefs.volume = volume
+        prefs.dirty = True
         logger.debug(f"Set volume to {volume} for user {user_id}")
     
     def get_user_volume(self, user_id: int) -> float:
         """Get volume preference for a user."""
-        return self.user_volumes.get(user_id, settings.default_volume)
+        return self._get_user_prefs(user_id).volume
+    
+    def flush_user_prefs(self) -> int:
+        """Persist changed user preferences to the database."""
+        flushed = 0
+        for user_id, prefs in self._user_prefs.items():
+            if not prefs.dirty:
+                continue
+            
+            if db_manager.update_user_settings(user_id, bass_boost_enabled=user_id in self.bass_boosted, default_volume=prefs.volume):
+                flushed += 1
+            # Users without a record cannot be persisted; don't retry them forever
+            prefs.dirty = False
+        
+        if flushed:
+            logger.debug(f"Flushed preferences for {flushed} users")
+        return flushed
     
     # DJ Role Management
     def get_dj_role_id(self, guild_id: int) -> Optional[int]:
         """Get the DJ role ID for a guild."""
+        if guild_id in self._dj_role_cache:
+            return self._dj_role_cache[guild_id]
+        
         guild_settings = db_manager.get_guild_settings(guild_id)
-        return guild_settings.dj_role_id if guild_settings else None
+        role_id = guild_settings.dj_role_id if guild_settings else None
+        self._dj_role_cache[guild_id] = role_id
+        return role_id
     
     def set_dj_role(self, guild_id: int, role_id: Optional[int]):
         """Set the DJ role for a guild."""
         db_manager.update_guild_settings(guild_id, dj_role_id=role_id)
+        self._dj_role_cache[guild_id] = role_id
         logger.info(f"Set DJ role to {role_id} for guild {guild_id}")
     
     # Statistics and Metrics
     def get_queue_duration(self, guild_id: int) -> int:
         """Get total duration of tracks in queue."""
-        queue = self.queues.get(guild_id, [])
-        return sum(track.duration for track in queue if track.duration)
+        state = self.states.get(guild_id)
+        if state is None:
+            return 0
+        
+        cached = state.queue_duration
+        if cached and cached[0] == state.queue_version:
+            return cached[1]
+        
+        total = sum(track.duration for track in state.queue if track.duration)
+        state.queue_duration = (state.queue_version, total)
+        return total
     
     def get_metrics(self) -> dict:
         """Get performance metrics."""
@@ -255,7 +562,7 @@ class MusicManager:
         voice_client = self.voice_clients.get(guild_id)
         
         # Calculate queue duration
-        queue_duration = sum(track.duration for track in queue if track.duration)
+        queue_duration = self.get_queue_duration(guild_id)
         
         # Get currently playing track info
         current_track_info = None
@@ -322,10 +629,7 @@ class MusicManager:
         # Queue metrics
         total_queued = sum(len(queue) for queue in self.queues.values())
         non_empty_queues = len([queue for queue in self.queues.values() if queue])
-        total_queue_duration = sum(
-            sum(track.duration for track in queue if track.duration) 
-            for queue in self.queues.values()
-        )
+        total_queue_duration = sum(self.get_queue_duration(guild_id) for guild_id in self.states)
         
         # Playing metrics
         currently_playing = len(self.now_playing)
@@ -349,7 +653,7 @@ class MusicManager:
         unique_users_in_queues = set()
         for queue in self.queues.values():
             for track in queue:
-                unique_users_in_queues.add(track.requested_by.id)
+                unique_users_in_queues.add(track.requester_id)
         
         # Performance metrics
         avg_queue_size = total_queued / max(1, total_guilds)
@@ -382,8 +686,8 @@ class MusicManager:
             'unique_users_in_queues': len(unique_users_in_queues),
             
             # User preferences
-            'users_with_bass_boost': len([uid for uid, enabled in self.user_bass_boost.items() if enabled]),
-            'users_with_custom_volume': len([uid for uid, vol in self.user_volumes.items() if vol != 0.5]),
+            'users_with_bass_boost': len(self.bass_boosted),
+            'users_with_custom_volume': len([uid for uid, prefs in self._user_prefs.items() if prefs.volume != 0.5]),
             
             # Loop states distribution
             'loop_states_distribution': {
@@ -5,6 +5,7 @@
 import asyncio
 import logging
 import time
+import aiohttp
 import psutil
 import traceback
 from typing import Dict, Any, List, Optional
@@ -113,7 +114,7 @@ class EnhancedHealthMonitor:
                     message=f"Check failed: {str(result)}",
                     timestamp=time.time(),
                     metrics={},
-                    details={'exception': str(result), 'traceback': traceback.format_exc()},
+                    details={'exception': str(result), 'traceback': ''.join(traceback.format_exception(result))},
                     recommendations=['Check system logs', 'Restart the affected service']
                 )
             else:
@@ -311,7 +312,7 @@ class EnhancedHealthMonitor:
             recommendations = []
             
             # CPU information
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = await asyncio.to_thread(psutil.cpu_percent, interval=1)
             cpu_count = psutil.cpu_count()
             load_avg = psutil.getloadavg() if hasattr(psutil, 'getloadavg') else None
             
@@ -466,7 +467,7 @@ class EnhancedHealthMonitor:
             
             current_time = time.time()
             
-            for guild_id, vc in music_manager.voice_clients.items():
+            for guild_id, vc in tuple(music_manager.voice_clients.items()):
                 try:
                     connection_info = {
                         'guild_id': guild_id,
@@ -713,7 +714,7 @@ class EnhancedHealthMonitor:
             
             details.update({
                 'error_types': error_types,
-                'recent_errors': recent_errors[-10:],  # Last 10 errors
+                'recent_errors': list(recent_errors)[-10:],  # Last 10 errors
                 'top_errors': sorted(error_types.items(), key=lambda x: x[1], reverse=True)[:5]
             })
             
@@ -1242,34 +1243,42 @@ class EnhancedHealthMonitor:
             # Test connectivity to important services
             connectivity_tests = {}
             
+            # Reuse the bot's pooled session; fall back to a temporary one
+            session = getattr(self.bot, 'http_session', None)
+            owns_session = session is None or session.closed
+            if owns_session:
+                session = aiohttp.ClientSession()
+            timeout = aiohttp.ClientTimeout(total=10)
+            
             try:
-                # Test Discord API connectivity
-                import aiohttp
-                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+                try:
+                    # Test Discord API connectivity
                     start_time = time.time()
-                    async with session.get('https://discord.com/api/v10/gateway') as response:
+                    async with session.get('https://discord.com/api/v10/gateway', timeout=timeout) as response:
                         discord_response_time = (time.time() - start_time) * 1000
                         connectivity_tests['discord_api'] = {
                             'status': response.status,
                             'response_time_ms': discord_response_time
                         }
-            except Exception as e:
-                connectivity_tests['discord_api'] = {'error': str(e)}
-                recommendations.append('Discord API connectivity issue')
-            
-            # Test YouTube connectivity (if using yt-dlp)
-            try:
-                start_time = time.time()
-                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-                    async with session.get('https://www.youtube.com') as response:
+                except Exception as e:
+                    connectivity_tests['discord_api'] = {'error': str(e)}
+                    recommendations.append('Discord API connectivity issue')
+                
+                # Test YouTube connectivity (if using yt-dlp)
+                try:
+                    start_time = time.time()
+                    async with session.get('https://www.youtube.com', timeout=timeout) as response:
                         youtube_response_time = (time.time() - start_time) * 1000
                         connectivity_tests['youtube'] = {
                             'status': response.status,
                             'response_time_ms': youtube_response_time
                         }
-            except Exception as e:
-                connectivity_tests['youtube'] = {'error': str(e)}
-                recommendations.append('YouTube connectivity issue')
+                except Exception as e:
+                    connectivity_tests['youtube'] = {'error': str(e)}
+                    recommendations.append('YouTube connectivity issue')
+            finally:
+                if owns_session:
+                    await session.close()
             
             details['connectivity_tests'] = connectivity_tests
             
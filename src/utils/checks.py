@@ -24,16 +24,16 @@ def is_dj_or_admin():
         if not guild:
             return False
         
-        # Check if user is administrator
+        # The owner passes without computing permissions; otherwise check administrator
+        if user.id == guild.owner_id:
+            return True
         if isinstance(user, discord.Member) and user.guild_permissions.administrator:
             return True
         
-        # Check DJ role
+        # Check DJ role by id against the member's role ids
         dj_role_id = music_manager.get_dj_role_id(guild.id)
-        if dj_role_id and isinstance(user, discord.Member):
-            dj_role = guild.get_role(dj_role_id)
-            if dj_role and dj_role in user.roles:
-                return True
+        if dj_role_id and user.get_role(dj_role_id) is not None:
+            return True
         
         # If no DJ role is set, allow everyone
         if not dj_role_id:
@@ -52,18 +52,18 @@ def is_dj_or_admin_slash():
         if not guild:
             return False
         
-        # Check if user is administrator
+        # The owner passes without computing permissions; otherwise check administrator
+        if user.id == guild.owner_id:
+            return True
         if isinstance(user, discord.Member) and user.guild_permissions.administrator:
             return True
         
-        # Check DJ role
+        # Check DJ role by id against the member's role ids
         dj_role_id = music_manager.get_dj_role_id(guild.id)
-        if dj_role_id and isinstance(user, discord.Member):
-            dj_role = guild.get_role(dj_role_id)
-            if dj_role and dj_role in user.roles:
+        if dj_role_id:
+            if user.get_role(dj_role_id) is not None:
                 return True
-            else:
-                raise PermissionError(f"You need the DJ role or administrator permissions to use this command.")
+            raise PermissionError(f"You need the DJ role or administrator permissions to use this command.")
         
         # If no DJ role is set, allow everyone
         return True
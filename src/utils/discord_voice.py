@@ -1,25 +1,62 @@
-import asyncio
 import discord
+import functools
 import logging
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 from src.core.music_manager import Track
 from src.utils.youtube import youtube_manager, YouTubeError
 from src.utils.non_disruptive_voice import voice_manager  # NEW IMPORT
+from src.utils.helpers import path_exists
+from src.utils.query_cache import query_cache
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+FFMPEG_BEFORE_OPTIONS = '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5'
+BASS_BOOST_FILTER = 'bass=g=4:f=70:w=0.4,equalizer=f=125:t=q:w=1:g=2'
+
+@functools.lru_cache(maxsize=64)
+def _ffmpeg_opts(bass_boost: bool, volume_percent: int) -> Mapping[str, str]:
+    """Build FFmpeg options for a bass boost/volume combination (read-only)."""
+    # One filter graph: a second -af would replace the volume filter, not chain after it
+    filters = f'volume={volume_percent / 100}'
+    if bass_boost:
+        filters += f',{BASS_BOOST_FILTER}'
+    
+    return MappingProxyType({
+        'before_options': FFMPEG_BEFORE_OPTIONS,
+        'options': f'-vn -filter:a "{filters}"'
+    })
+
+def get_ffmpeg_options(bass_boost: bool = False, volume: float = 0.5) -> dict:
+    """Get a mutable copy of the FFmpeg options for the given settings."""
+    return dict(_ffmpeg_opts(bass_boost, round(volume * 100)))
+
+def can_passthrough_opus(video_info: dict, source_url: str, bass_boost: bool, volume: float) -> bool:
+    """Check whether a source can be sent to Discord without re-encoding.
+    
+    Only applies at exactly 100% volume with bass boost off; the default
+    volume of 50% always re-encodes. Only the stream URL qualifies, since
+    'acodec' describes the stream and not a downloaded file.
+    """
+    # Any filter (bass boost or a volume other than 100%) needs a decode
+    return (
+        not bass_boost
+        and round(volume * 100) == 100
+        and source_url == video_info.get('stream_url')
+        and video_info.get('acodec') == 'opus'
+    )
+
 async def join_voice_channel(interaction: discord.Interaction, channel: discord.VoiceChannel) -> Optional[discord.VoiceClient]:
     """Join a voice channel using non-disruptive methods."""
     try:
-        # Check if bot is already connected
-        if interaction.guild.voice_client:
-            if interaction.guild.voice_client.channel == channel:
-                return interaction.guild.voice_client
-            else:
-                await interaction.guild.voice_client.move_to(channel)
-                return interaction.guild.voice_client
+        # Check if bot is already connected; read the voice client once
+        current_vc = interaction.guild.voice_client
+        if current_vc:
+            if current_vc.channel != channel:
+                await current_vc.move_to(channel)
+            return current_vc
         
         # Try non-disruptive connection - UPDATED METHOD
         vc = await voice_manager.connect_with_peak_hour_strategy(channel)
@@ -44,33 +81,35 @@ async def join_voice_channel(interaction: discord.Interaction, channel: discord.
         await interaction.followup.send("❌ Failed to join voice channel.", ephemeral=True)
         return None
 
+def _pick_source(video_info: dict) -> Optional[str]:
+    """Use the downloaded file if it is still on disk, otherwise the stream URL."""
+    local_file = video_info.get('downloaded_file')
+    if local_file:
+        if path_exists(local_file):
+            return local_file
+        logger.debug("Downloaded file is gone, streaming instead: %s", local_file)
+    return video_info.get('stream_url')
+
 async def create_audio_source(track: Track, bass_boost: bool = False, volume: float = 0.5) -> discord.AudioSource:
     """Create audio source for a track."""
     try:
-        # Get stream info
-        video_info = await youtube_manager.get_info(track.query, download=settings.download_enabled)
-        
-        # FFmpeg options
-        ffmpeg_options = {
-            'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
-            'options': f'-vn -filter:a "volume={volume}"'
-        }
-        
-        # Add bass boost if enabled
-        if bass_boost:
-            bass_filter = 'bass=g=4:f=70:w=0.4,equalizer=f=125:t=q:w=1:g=2'
-            ffmpeg_options['options'] += f' -af "{bass_filter}"'
-        
-        # Use downloaded file if available, otherwise stream URL
-        source_url = video_info.get('downloaded_file') or video_info['stream_url']
+        # Use prefetched info while its stream URL is still valid, otherwise resolve now
+        video_info = track.fresh_prepared_info(query_cache.ttl)
+        source_url = _pick_source(video_info) if video_info else None
+        if not source_url:
+            video_info = await youtube_manager.get_info(track.query, download=settings.download_enabled)
+            source_url = _pick_source(video_info)
         
         if not source_url:
             raise YouTubeError("No audio source available")
         
-        # Create audio source
-        audio_source = discord.FFmpegPCMAudio(source_url, **ffmpeg_options)
+        # Create audio source, copying Opus packets straight through when no filter applies
+        if can_passthrough_opus(video_info, source_url, bass_boost, volume):
+            audio_source = discord.FFmpegOpusAudio(source_url, codec='copy', before_options=FFMPEG_BEFORE_OPTIONS)
+        else:
+            audio_source = discord.FFmpegPCMAudio(source_url, **get_ffmpeg_options(bass_boost, volume))
         
-        logger.debug(f"Created audio source for: {track.title}")
+        logger.debug("Created audio source for: %s", track.title)
         return audio_source
         
     except Exception as e:
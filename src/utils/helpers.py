@@ -1,19 +1,31 @@
 import asyncio
 import functools
+import os
+import re
 import time
+from collections import deque
 from typing import Any, Callable, Optional
 from datetime import datetime, timedelta
 
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w\s.-]')
+
 def format_duration(seconds: Optional[int], include_hours: bool = False) -> str:
     """Format duration in seconds to MM:SS or HH:MM:SS format."""
     if seconds is None:
         return "N/A"
     
-    try:
-        seconds = int(seconds)
-    except (ValueError, TypeError):
-        return "N/A"
+    # Track durations are already ints; only coerce anything else
+    if type(seconds) is not int:
+        try:
+            seconds = int(seconds)
+        except (ValueError, TypeError):
+            return "N/A"
     
+    return _format_duration_cached(seconds, include_hours)
+
+@functools.lru_cache(maxsize=8192)
+def _format_duration_cached(seconds: int, include_hours: bool) -> str:
+    """Cached formatter behind format_duration; durations repeat constantly."""
     if seconds < 0:
         return "N/A"
     
@@ -25,6 +37,19 @@ def format_duration(seconds: Optional[int], include_hours: bool = False) -> str:
     else:
         return f"{mins:02d}:{secs:02d}"
 
+@functools.lru_cache(maxsize=4096)
+def _path_exists_cached(path: str, bucket: int) -> bool:
+    """Cached os.path.exists; a new bucket every 30 seconds expires old entries."""
+    return os.path.exists(path)
+
+def path_exists(path: str) -> bool:
+    """Check a file path without hitting the filesystem on every track start."""
+    return _path_exists_cached(path, int(time.monotonic() // 30))
+
+def clear_path_cache():
+    """Forget cached path checks, e.g. after files were deleted."""
+    _path_exists_cached.cache_clear()
+
 def format_timestamp(timestamp: float) -> str:
     """Format Unix timestamp to readable string."""
     dt = datetime.fromtimestamp(timestamp)
@@ -72,18 +97,19 @@ def chunks(lst: list, chunk_size: int):
 def rate_limit(calls: int, period: int):
     """Rate limiting decorator."""
     def decorator(func: Callable):
-        calls_made = []
+        calls_made = deque()
         
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             now = time.time()
-            # Remove calls outside the period
-            calls_made[:] = [call_time for call_time in calls_made if now - call_time < period]
+            # Remove calls outside the period; timestamps are in order, so stop at the first live one
+            while calls_made and now - calls_made[0] >= period:
+                calls_made.popleft()
             
             if len(calls_made) >= calls:
                 sleep_time = period - (now - calls_made[0])
                 await asyncio.sleep(sleep_time)
-                calls_made.pop(0)
+                calls_made.popleft()
             
             calls_made.append(now)
             return await func(*args, **kwargs)
@@ -115,15 +141,13 @@ def retry(max_attempts: int = 3, delay: float = 1.0, backoff: float = 2.0):
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage."""
-    import re
-    
     # Remove or replace invalid characters
     invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
     for char in invalid_chars:
         filename = filename.replace(char, '_')
     
     # Remove extra whitespace and control characters
-    filename = re.sub(r'[^\w\s.-]', '', filename)
+    filename = _UNSAFE_FILENAME_CHARS_RE.sub('', filename)
     
     # Limit length
     if len(filename) > 255:
@@ -138,11 +162,17 @@ class ProgressBar:
     def create(current: int, total: int, length: int = 20, fill: str = "█", empty: str = "─") -> str:
         """Create progress bar string."""
         if total <= 0:
-            return empty * length
+            return ProgressBar._render(0, length, fill, empty)
         
         progress = min(1.0, current / total)
         filled_length = int(length * progress)
         
+        return ProgressBar._render(filled_length, length, fill, empty)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _render(filled_length: int, length: int, fill: str, empty: str) -> str:
+        """Build the bar string; identical fill levels share one cached string."""
         bar = fill * filled_length + empty * (length - filled_length)
         return f"`{bar}`"
 
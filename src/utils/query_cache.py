@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class QueryCache:
+    """TTL cache for resolved track info, keyed by normalized query."""
+
+    def __init__(self, ttl: float = 18000, check_interval: float = 3600):
+        self.ttl = ttl  # 5 hours, inside YouTube's stream URL lifetime
+        self.check_interval = check_interval
+        self._entries: Dict[str, Tuple[float, dict]] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query so equivalent searches share an entry."""
+        query = " ".join(query.split())
+        # Video IDs are case-sensitive, so only plain searches are lowercased
+        if query.startswith(('http', 'www')):
+            return query
+        return query.lower()
+
+    def _key(self, query: str, namespace: str) -> str:
+        return f"{namespace}:{self.normalize(query)}"
+
+    def get(self, query: str, namespace: str = "") -> Optional[dict]:
+        """Get cached info for a query, or None if missing or expired."""
+        key = self._key(query, namespace)
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+
+        expires_at, info = entry
+        if time.monotonic() >= expires_at:
+            self._entries.pop(key, None)
+            return None
+        return info
+
+    def put(self, query: str, info: dict, namespace: str = ""):
+        """Cache info for a query."""
+        self._entries[self._key(query, namespace)] = (time.monotonic() + self.ttl, info)
+
+    def sweep(self) -> int:
+        """Remove expired entries."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if now >= expires_at]
+        for key in expired:
+            del self._entries[key]
+
+        if expired:
+            logger.debug(f"Query cache sweep removed {len(expired)} entries")
+        return len(expired)
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+
+    def start(self):
+        """Start the periodic sweep on the running event loop."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    def stop(self):
+        """Stop the periodic sweep."""
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Error sweeping query cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Global query cache instance
+query_cache = QueryCache()
@@ -3,15 +3,19 @@ import validators
 from typing import Optional, Tuple
 from urllib.parse import urlparse
 
+# Compiled once; these run on every /play request
+_YOUTUBE_URL_RE = re.compile(
+    r'(?:https?://)?(?:www\.)?(?:'
+    r'youtube\.com/watch\?v=|'
+    r'youtu\.be/|'
+    r'youtube\.com/playlist\?list='
+    r')([a-zA-Z0-9_-]+)'
+)
+_INVALID_QUERY_CHARS_RE = re.compile(r'[<>@#]')
+
 def validate_youtube_url(url: str) -> bool:
     """Validate if URL is a valid YouTube URL."""
-    youtube_patterns = [
-        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]+)',
-        r'(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]+)',
-        r'(?:https?://)?(?:www\.)?youtube\.com/playlist\?list=([a-zA-Z0-9_-]+)',
-    ]
-    
-    return any(re.match(pattern, url) for pattern in youtube_patterns)
+    return _YOUTUBE_URL_RE.match(url) is not None
 
 def validate_playlist_name(name: str) -> Tuple[bool, Optional[str]]:
     """Validate playlist name."""
@@ -40,7 +44,7 @@ def validate_search_query(query: str) -> Tuple[bool, Optional[str]]:
         return False, "Search query must be 500 characters or less"
     
     # Remove common problematic patterns
-    cleaned_query = re.sub(r'[<>@#]', '', query.strip())
+    cleaned_query = _INVALID_QUERY_CHARS_RE.sub('', query.strip())
     if not cleaned_query:
         return False, "Search query contains only invalid characters"
     
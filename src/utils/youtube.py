@@ -3,14 +3,14 @@ import functools
 import logging
 import os
 import time
-import hashlib
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional
 import yt_dlp
 from datetime import datetime
 
 from config.settings import settings
-from src.utils.helpers import retry
+from src.utils.helpers import clear_path_cache, format_duration, retry, truncate_string
+from src.utils.query_cache import QueryCache, query_cache
 from src.utils.validators import sanitize_filename
 from src.core.database_manager import db_manager
 
@@ -20,14 +20,19 @@ class YouTubeError(Exception):
     """Custom YouTube-related error."""
     pass
 
+def _extract_info(opts: dict, query: str, download: bool) -> Optional[dict]:
+    """Run a yt-dlp extraction; called in the executor, YoutubeDL setup included."""
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        return ydl.extract_info(query, download=download)
+
 class YouTubeManager:
     """Enhanced YouTube manager with caching and error handling."""
     
     def __init__(self):
-        self.cache: Dict[str, dict] = {}
-        self.cache_ttl = 3600  # 1 hour
         self.rate_limit_delay = 1.0
         self.last_request_time = 0
+        # Lookups in progress, so concurrent identical queries share one extraction
+        self._inflight: Dict[str, asyncio.Task] = {}
         
         # Create downloads directory
         os.makedirs("downloads", exist_ok=True)
@@ -44,14 +49,6 @@ class YouTubeManager:
             'writeinfojson': False,
         }
     
-    def _get_cache_key(self, query: str, options: dict = None) -> str:
-        """Generate cache key for query."""
-        return f"{query}_{hash(str(options or {}))}"
-    
-    def _is_cache_valid(self, entry: dict) -> bool:
-        """Check if cache entry is still valid."""
-        return time.time() - entry['timestamp'] < self.cache_ttl
-    
     async def _rate_limit(self):
         """Apply rate limiting."""
         elapsed = time.time() - self.last_request_time
@@ -59,15 +56,32 @@ class YouTubeManager:
             await asyncio.sleep(self.rate_limit_delay - elapsed)
         self.last_request_time = time.time()
     
-    @retry(max_attempts=3, delay=2.0)
+    async def _deduplicate(self, key: str, fetch: Callable[[], Awaitable]):
+        """Await the in-flight lookup for key, starting it if there is none."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.debug("Joining in-flight lookup: %s", key)
+        # Shielded so one caller cancelling doesn't cancel the lookup for the others
+        return await asyncio.shield(task)
+    
     async def search(self, query: str, max_results: int = 5) -> List[dict]:
         """Search for videos on YouTube."""
-        cache_key = self._get_cache_key(f"search_{query}_{max_results}")
+        key = f"search{max_results}:{QueryCache.normalize(query)}"
+        return await self._deduplicate(key, lambda: self._search(query, max_results))
+    
+    @retry(max_attempts=3, delay=2.0)
+    async def _search(self, query: str, max_results: int) -> List[dict]:
+        cache_namespace = f'search{max_results}'
         
-        # Check cache
-        if cache_key in self.cache and self._is_cache_valid(self.cache[cache_key]):
-            logger.debug(f"Cache hit for search: {query}")
-            return self.cache[cache_key]['data']
+        # Check cache; shares normalization and expiry with get_info
+        cached = query_cache.get(query, namespace=cache_namespace)
+        if cached is not None:
+            logger.debug("Cache hit for search: %s", query)
+            return cached
         
         await self._rate_limit()
         
@@ -81,12 +95,11 @@ class YouTubeManager:
         loop = asyncio.get_event_loop()
         
         try:
-            with yt_dlp.YoutubeDL(search_opts) as ydl:
-                extract_task = loop.run_in_executor(
-                    None, 
-                    functools.partial(ydl.extract_info, query, download=False)
-                )
-                info = await asyncio.wait_for(extract_task, timeout=30.0)
+            extract_task = loop.run_in_executor(
+                None,
+                functools.partial(_extract_info, search_opts, query, False)
+            )
+            info = await asyncio.wait_for(extract_task, timeout=30.0)
             
             if not info or 'entries' not in info:
                 raise YouTubeError("No search results found")
@@ -96,9 +109,12 @@ class YouTubeManager:
                 if not entry:
                     continue
                 
+                title = entry.get('title', 'Unknown Title')
                 result = {
                     'id': entry.get('id'),
-                    'title': entry.get('title', 'Unknown Title'),
+                    'title': title,
+                    # Display-length title, built once here instead of per render
+                    'label': truncate_string(title, 90),
                     'url': entry.get('webpage_url', ''),
                     'duration': entry.get('duration'),
                     'duration_str': self._format_duration(entry.get('duration')),
@@ -113,12 +129,9 @@ class YouTubeManager:
                     break
             
             # Cache results
-            self.cache[cache_key] = {
-                'data': results,
-                'timestamp': time.time()
-            }
+            query_cache.put(query, results, namespace=cache_namespace)
             
-            logger.debug(f"Search completed: {query} - {len(results)} results")
+            logger.debug("Search completed: %s - %s results", query, len(results))
             return results
             
         except asyncio.TimeoutError:
@@ -127,9 +140,15 @@ class YouTubeManager:
             logger.error(f"Search error for '{query}': {e}")
             raise YouTubeError(f"Search failed: {str(e)}")
     
-    @retry(max_attempts=3, delay=2.0)
     async def get_info(self, url_or_query: str, download: bool = True) -> Dict:
         """Enhanced info extraction with database integration."""
+        key = f"{'download' if download else 'stream'}:{QueryCache.normalize(url_or_query)}"
+        info = await self._deduplicate(key, lambda: self._get_info(url_or_query, download))
+        # Callers that joined the same lookup each get their own dict
+        return info.copy()
+    
+    @retry(max_attempts=3, delay=2.0)
+    async def _get_info(self, url_or_query: str, download: bool) -> Dict:
         
         # First check if we already have this song downloaded in database
         if download and url_or_query.startswith(('http', 'https')):
@@ -137,20 +156,21 @@ class YouTubeManager:
             if existing_path:
                 logger.info(f"Using existing download: {existing_path}")
                 # Get cached info and update with local path
-                cache_key = self._get_cache_key(f"info_{url_or_query}_false")
-                if cache_key in self.cache and self._is_cache_valid(self.cache[cache_key]):
-                    result = self.cache[cache_key]['data'].copy()
+                cached = query_cache.get(url_or_query, namespace='stream')
+                if cached:
+                    result = cached.copy()
                     result['downloaded_file'] = existing_path
                     result['local_path'] = existing_path
                     return result
         
         # Continue with existing get_info logic...
-        cache_key = self._get_cache_key(f"info_{url_or_query}_{download}")
+        cache_namespace = 'download' if download else 'stream'
         
         # Check cache
-        if cache_key in self.cache and self._is_cache_valid(self.cache[cache_key]):
-            logger.debug(f"Cache hit for info: {url_or_query}")
-            return self.cache[cache_key]['data']
+        cached = query_cache.get(url_or_query, namespace=cache_namespace)
+        if cached:
+            logger.debug("Cache hit for info: %s", url_or_query)
+            return cached.copy()
         
         await self._rate_limit()
         
@@ -170,12 +190,11 @@ class YouTubeManager:
         loop = asyncio.get_event_loop()
         
         try:
-            with yt_dlp.YoutubeDL(info_opts) as ydl:
-                extract_task = loop.run_in_executor(
-                    None,
-                    functools.partial(ydl.extract_info, url_or_query, download=download)
-                )
-                info = await asyncio.wait_for(extract_task, timeout=60.0)
+            extract_task = loop.run_in_executor(
+                None,
+                functools.partial(_extract_info, info_opts, url_or_query, download)
+            )
+            info = await asyncio.wait_for(extract_task, timeout=60.0)
             
             if not info:
                 raise YouTubeError("No video information found")
@@ -203,6 +222,9 @@ class YouTubeManager:
                 'like_count': entry.get('like_count', 0),
                 'upload_date': entry.get('upload_date'),
                 'formats': entry.get('formats', []),
+                'acodec': entry.get('acodec'),
+                # Stream URLs expire; cache hits keep this so their age is known
+                'resolved_at': time.time(),
                 'downloaded_file': None,
                 'local_path': None,
                 'file_size': None
@@ -242,14 +264,12 @@ class YouTubeManager:
                         audio_formats[0]
                     )
                     result['stream_url'] = best_format['url']
+                    result['acodec'] = best_format.get('acodec')
             
-            # Cache result
-            self.cache[cache_key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
+            # Cache the resolved metadata; the format list is only needed to pick stream_url
+            query_cache.put(url_or_query, {**result, 'formats': []}, namespace=cache_namespace)
             
-            logger.debug(f"Info extraction completed: {result['title']}")
+            logger.debug("Info extraction completed: %s", result['title'])
             return result
             
         except asyncio.TimeoutError:
@@ -280,6 +300,10 @@ class YouTubeManager:
                     except OSError as e:
                         logger.error(f"Failed to remove {filename}: {e}")
         
+        if cleaned_files:
+            # Cached existence checks may still report the removed files
+            clear_path_cache()
+        
         # Clean up database entries for missing files
         db_cleaned = db_manager.cleanup_missing_downloads()
         
@@ -312,24 +336,11 @@ class YouTubeManager:
     
     def _format_duration(self, duration: Optional[int]) -> str:
         """Format duration in seconds to MM:SS format."""
-        if duration is None:
-            return "N/A"
-        
-        try:
-            duration = int(duration)
-            minutes, seconds = divmod(duration, 60)
-            hours, minutes = divmod(minutes, 60)
-            
-            if hours > 0:
-                return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            else:
-                return f"{minutes:02d}:{seconds:02d}"
-        except (ValueError, TypeError):
-            return "N/A"
+        return format_duration(duration)
     
     def clear_cache(self):
         """Clear the cache."""
-        self.cache.clear()
+        query_cache.clear()
         logger.info("YouTube cache cleared")
 
     async def get_info_with_database(self, url_or_query: str, requested_by: int = None) -> dict:
@@ -3,6 +3,7 @@
 """Comprehensive Web Dashboard for BasslineBot Pro."""
 
 import asyncio
+import itertools
 import json
 import logging
 import psutil
@@ -113,7 +114,7 @@ async def get_system_info():
     """Get detailed system information."""
     try:
         # System metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = await asyncio.to_thread(psutil.cpu_percent, interval=1)
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
         
@@ -361,7 +362,7 @@ async def get_error_info():
             error_handler = bot.error_handler
             error_info.update({
                 "total_errors": getattr(error_handler, 'error_count', 0),
-                "recent_errors": getattr(error_handler, 'recent_errors', [])[-50:],  # Last 50 errors
+                "recent_errors": list(getattr(error_handler, 'recent_errors', []))[-50:],  # Last 50 errors
                 "error_rate": len(getattr(error_handler, 'recent_errors', [])) / max(1, 
                     (time.time() - getattr(bot, 'startup_time', time.time())) / 3600)  # Errors per hour
             })
@@ -466,7 +467,7 @@ async def get_troubleshooting_info():
                 "recommendation": "Consider restarting the bot or increasing system memory"
             })
         
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = await asyncio.to_thread(psutil.cpu_percent, interval=1)
         if cpu_percent > 80:
             issues.append({
                 "type": "warning",
@@ -512,7 +513,11 @@ async def get_detailed_music_info():
     try:
         detailed_info = {}
         
-        for guild_id in music_manager.voice_clients.keys():
+        for i, guild_id in enumerate(tuple(music_manager.voice_clients)):
+            if i and i % 50 == 0:
+                # Yield so a large guild list doesn't stall the event loop
+                await asyncio.sleep(0)
+            
             guild_stats = music_manager.get_guild_stats(guild_id)
             queue = music_manager.get_queue(guild_id)
             
@@ -537,7 +542,7 @@ async def get_detailed_music_info():
                         "url": track.url,
                         "thumbnail": track.thumbnail
                     }
-                    for track in queue[:10]  # Limit to first 10 tracks
+                    for track in itertools.islice(queue, 10)  # Limit to first 10 tracks
                 ],
                 "queue_summary": {
                     "total_tracks": len(queue),
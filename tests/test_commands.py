@@ -56,6 +56,7 @@ def mock_interaction(mock_guild, mock_user):
     """Create a mock Discord interaction."""
     interaction = Mock(spec=discord.Interaction)
     interaction.guild = mock_guild
+    interaction.guild_id = mock_guild.id
     interaction.user = mock_user
     interaction.channel = Mock()
     interaction.response = Mock()
@@ -156,6 +157,43 @@ class TestMusicCommands:
                     args, kwargs = mock_interaction.response.send_message.call_args
                     assert 'embed' in kwargs
 
+    @pytest.mark.asyncio
+    async def test_play_next_failure_in_queue_loop(self, mock_bot):
+        """A failed start during QUEUE loop must not put the previous track back twice."""
+        from src.core.music_manager import music_manager, Track, LoopState, VoiceStatus
+        
+        music_cog = MusicCommands(mock_bot)
+        guild_id = 424242
+        previous, broken, working = (
+            Track(
+                query=title,
+                title=title,
+                url=f"https://youtube.com/watch?v={title}",
+                duration=180,
+                thumbnail="https://img.youtube.com/vi/test/default.jpg",
+                uploader="Test Uploader",
+                requested_by=Mock()
+            )
+            for title in ("previous", "broken", "working")
+        )
+        
+        music_manager.set_loop_state(guild_id, LoopState.QUEUE)
+        await music_manager.add_to_queue(guild_id, broken)
+        await music_manager.add_to_queue(guild_id, working)
+        music_manager.set_now_playing(guild_id, previous, Mock())
+        
+        voice = VoiceStatus(Mock(), True, False, False)
+        with patch('src.core.music_manager.music_manager.get_voice_status', return_value=voice):
+            with patch('src.commands.music_commands.PLAYBACK_RETRY_DELAY', 0):
+                with patch.object(music_cog, '_get_now_playing_channel', return_value=Mock()):
+                    with patch.object(music_cog, '_announce_now_playing'):
+                        with patch.object(music_cog, '_start_track', AsyncMock(side_effect=[Exception("broken"), None])) as mock_start:
+                            await music_cog._play_next(guild_id)
+        
+        assert [call.args[2] for call in mock_start.call_args_list] == [broken, working]
+        assert list(music_manager.get_queue(guild_id)) == [previous]
+        music_manager.clear_guild_state(guild_id)
+
 class TestAdminCommands:
     """Test admin commands."""
     
@@ -89,6 +89,23 @@ class TestMusicManager:
             success = await music_manager.add_to_queue(guild_id, sample_track)
             assert success is False
     
+    @pytest.mark.asyncio
+    async def test_add_many_to_queue(self, music_manager, sample_track):
+        """Test batch adds stop at the queue size limit."""
+        guild_id = 123456
+        
+        with patch('src.core.music_manager.db_manager.get_guild_settings') as mock_settings:
+            mock_guild = Mock()
+            mock_guild.max_queue_size = 3
+            mock_settings.return_value = mock_guild
+            
+            added = await music_manager.add_many_to_queue(guild_id, [sample_track] * 5)
+            assert added == 3
+            assert len(music_manager.get_queue(guild_id)) == 3
+            
+            # Queue is full now
+            assert await music_manager.add_many_to_queue(guild_id, [sample_track]) == 0
+    
     def test_get_next_track(self, music_manager, sample_track):
         """Test getting next track from queue."""
         guild_id = 123456
@@ -136,7 +153,23 @@ class TestMusicManager:
         # Should have same tracks but potentially different order
         assert len(shuffled_titles) == len(original_titles)
         assert set(shuffled_titles) == set(original_titles)
-    
+
+    def test_queue_version_and_duration(self, music_manager, sample_track):
+        """Test queue mutations bump the version and refresh the cached duration."""
+        guild_id = 123456
+
+        assert music_manager.get_queue_version(guild_id) == 0
+        assert music_manager.get_queue_duration(guild_id) == 0
+
+        asyncio.run(music_manager.add_to_queue(guild_id, sample_track))
+        version = music_manager.get_queue_version(guild_id)
+        assert version > 0
+        assert music_manager.get_queue_duration(guild_id) == 180
+
+        music_manager.pop_next_track(guild_id)
+        assert music_manager.get_queue_version(guild_id) > version
+        assert music_manager.get_queue_duration(guild_id) == 0
+
     def test_loop_states(self, music_manager):
         """Test loop state management."""
         guild_id = 123456
@@ -152,6 +185,36 @@ class TestMusicManager:
         music_manager.set_loop_state(guild_id, LoopState.QUEUE)
         assert music_manager.get_loop_state(guild_id) == LoopState.QUEUE
     
+    def test_advance_queue_loop_states(self, music_manager, sample_track, mock_user):
+        """Test advancing the queue in each loop mode."""
+        guild_id = 123456
+        other_track = Track(
+            query="other song",
+            title="Other Song",
+            url="https://youtube.com/watch?v=other",
+            duration=120,
+            thumbnail="https://img.youtube.com/vi/other/default.jpg",
+            uploader="Test Uploader",
+            requested_by=mock_user
+        )
+        asyncio.run(music_manager.add_to_queue(guild_id, other_track))
+        music_manager.set_now_playing(guild_id, sample_track, Mock())
+
+        # SINGLE replays the current track and leaves the queue alone
+        music_manager.set_loop_state(guild_id, LoopState.SINGLE)
+        assert music_manager.advance_queue(guild_id) is sample_track
+        assert len(music_manager.get_queue(guild_id)) == 1
+
+        # QUEUE moves the current track to the back
+        music_manager.set_loop_state(guild_id, LoopState.QUEUE)
+        assert music_manager.advance_queue(guild_id) is other_track
+        assert music_manager.get_queue(guild_id)[0] is sample_track
+
+        # OFF just pops
+        music_manager.set_loop_state(guild_id, LoopState.OFF)
+        assert music_manager.advance_queue(guild_id) is sample_track
+        assert music_manager.advance_queue(guild_id) is None
+
     def test_bass_boost_toggle(self, music_manager):
         """Test bass boost functionality."""
         user_id = 123456
@@ -168,6 +231,57 @@ class TestMusicManager:
         result = music_manager.toggle_bass_boost(user_id)
         assert result is False
         assert music_manager.get_bass_boost(user_id) is False
+
+    def test_flush_user_prefs(self, music_manager):
+        """Test preference changes are persisted in batches."""
+        user_id = 123456
+
+        with patch('src.core.music_manager.db_manager') as mock_db:
+            mock_db.get_user.return_value = None
+            mock_db.update_user_settings.return_value = True
+
+            music_manager.toggle_bass_boost(user_id)
+            music_manager.set_user_volume(user_id, 0.8)
+            mock_db.update_user_settings.assert_not_called()
+
+            assert music_manager.flush_user_prefs() == 1
+            mock_db.update_user_settings.assert_called_once_with(
+                user_id, bass_boost_enabled=True, default_volume=0.8
+            )
+
+            # Nothing left to flush
+            assert music_manager.flush_user_prefs() == 0
+
+    def test_dj_role_cache(self, music_manager):
+        """Test the DJ role is read from the database once and updated on set."""
+        guild_id = 123456
+
+        with patch('src.core.music_manager.db_manager') as mock_db:
+            mock_db.get_guild_settings.return_value = Mock(dj_role_id=555)
+
+            assert music_manager.get_dj_role_id(guild_id) == 555
+            assert music_manager.get_dj_role_id(guild_id) == 555
+            mock_db.get_guild_settings.assert_called_once_with(guild_id)
+
+            music_manager.set_dj_role(guild_id, None)
+            assert music_manager.get_dj_role_id(guild_id) is None
+            mock_db.get_guild_settings.assert_called_once()
+
+    def test_get_voice_client(self, music_manager):
+        """Test voice client lookup skips disconnected clients."""
+        guild_id = 123456
+        
+        # Nothing stored yet
+        assert music_manager.get_voice_client(guild_id) is None
+        
+        vc = Mock()
+        vc.is_connected.return_value = True
+        music_manager.voice_clients[guild_id] = vc
+        assert music_manager.get_voice_client(guild_id) is vc
+        
+        # Disconnected clients are treated as missing
+        vc.is_connected.return_value = False
+        assert music_manager.get_voice_client(guild_id) is None
     
     def test_clear_guild_state(self, music_manager, sample_track):
         """Test clearing guild state."""
@@ -185,6 +299,54 @@ class TestMusicManager:
         assert len(music_manager.get_queue(guild_id)) == 0
         assert music_manager.get_loop_state(guild_id) == LoopState.OFF
         assert guild_id not in music_manager.last_activity
+    
+    def test_voice_status(self, music_manager):
+        """Test the voice status snapshot for missing, disconnected and playing clients."""
+        guild_id = 123456
+        assert music_manager.get_voice_status(guild_id).vc is None
+        
+        vc = Mock()
+        vc.is_connected.return_value = False
+        music_manager.voice_clients[guild_id] = vc
+        assert music_manager.get_voice_status(guild_id).connected is False
+        
+        vc.is_connected.return_value = True
+        vc.is_playing.return_value = True
+        vc.is_paused.return_value = False
+        status = music_manager.get_voice_status(guild_id)
+        assert status.vc is vc
+        assert status.playing is True
+        assert status.paused is False
+    
+    def test_idle_timer(self, music_manager):
+        """Test the idle handler fires once after activity stops, and not after clearing."""
+        fired = []
+        
+        async def on_idle(guild_id):
+            fired.append(guild_id)
+        
+        async def run():
+            music_manager.set_idle_handler(on_idle)
+            with patch('src.core.music_manager.settings') as mock_settings:
+                mock_settings.idle_timeout = 0.01
+                music_manager.update_last_activity(1)
+                music_manager.update_last_activity(1)
+                music_manager.update_last_activity(2)
+                music_manager.clear_guild_state(2)
+                await asyncio.sleep(0.05)
+        
+        asyncio.run(run())
+        assert fired == [1]
+    
+    def test_activity_writes_coalesced(self, music_manager):
+        """Test activity updates within the write interval keep the first timestamp."""
+        guild_id = 123456
+        music_manager.update_last_activity(guild_id)
+        first = music_manager.get_last_activity(guild_id)
+        
+        with patch('src.core.music_manager.time.time', return_value=first + 0.5):
+            music_manager.update_last_activity(guild_id)
+        assert music_manager.get_last_activity(guild_id) == first
 
 class TestYouTubeManager:
     """Test the YouTube manager."""
@@ -248,6 +410,26 @@ class TestYouTubeManager:
             
             assert "timed out" in str(exc_info.value)
     
+    @pytest.mark.asyncio
+    async def test_concurrent_searches_share_lookup(self):
+        """Test identical searches in flight together run one extraction."""
+        youtube_manager = YouTubeManager()
+        results = [{'id': 'test123', 'title': 'Test Song'}]
+        
+        async def slow_search(query, max_results):
+            await asyncio.sleep(0.01)
+            return results
+        
+        with patch.object(youtube_manager, '_search', side_effect=slow_search) as mock_search:
+            first, second = await asyncio.gather(
+                youtube_manager.search("Test Song"),
+                youtube_manager.search("test  song")
+            )
+        
+        assert first == second == results
+        mock_search.assert_called_once()
+        assert not youtube_manager._inflight
+    
     @pytest.mark.asyncio
     async def test_get_info_success(self):
         """Test successful video info retrieval."""
@@ -282,26 +464,41 @@ class TestYouTubeManager:
             assert result['title'] == 'Test Song'
             assert result['id'] == 'test123'
             assert result['stream_url'] is not None
+            assert result['resolved_at'] <= time.time()
     
-    def test_cache_functionality(self):
-        """Test caching functionality."""
+    @pytest.mark.asyncio
+    async def test_cached_info_keeps_resolve_time(self, mock_user):
+        """Test an old cache hit is not treated as freshly resolved."""
+        from src.utils.query_cache import query_cache
+        
         youtube_manager = YouTubeManager()
+        query = "https://youtube.com/watch?v=cached123"
+        resolved_at = time.time() - (query_cache.ttl - 60)
+        query_cache.put(query, {'title': 'Cached Song', 'stream_url': 'https://example.com/audio', 'resolved_at': resolved_at}, namespace='stream')
         
-        # Test cache key generation
-        key1 = youtube_manager._get_cache_key("test query")
-        key2 = youtube_manager._get_cache_key("test query")
-        key3 = youtube_manager._get_cache_key("different query")
+        try:
+            with patch('yt_dlp.YoutubeDL') as mock_ydl:
+                info = await youtube_manager.get_info(query, download=False)
+            mock_ydl.assert_not_called()
+        finally:
+            query_cache.clear()
         
-        assert key1 == key2
-        assert key1 != key3
+        assert info['resolved_at'] == resolved_at
         
-        # Test cache validity
-        current_time = time.time()
-        valid_entry = {'timestamp': current_time, 'data': 'test'}
-        old_entry = {'timestamp': current_time - 7200, 'data': 'test'}  # 2 hours old
+        track = Track(
+            query=query,
+            title="Cached Song",
+            url=query,
+            duration=180,
+            thumbnail="https://img.youtube.com/vi/test/default.jpg",
+            uploader="Test Uploader",
+            requested_by=mock_user,
+            prepared_info=info
+        )
         
-        assert youtube_manager._is_cache_valid(valid_entry) is True
-        assert youtube_manager._is_cache_valid(old_entry) is False
+        # Only a minute of the URL's lifetime is left, however recently it was attached
+        assert track.fresh_prepared_info(query_cache.ttl) is info
+        assert track.fresh_prepared_info(query_cache.ttl - 120) is None
 
 class TestTrack:
     """Test the Track dataclass."""
@@ -321,5 +518,31 @@ class TestTrack:
         assert track.title == "Test Song"
         assert track.duration == 180
         assert track.requested_by == mock_user
+        assert track.requester_id == mock_user.id
         assert track.added_at <= time.time()
-        assert track.added_at > time.time() - 1  # Added within last second
\ No newline at end of file
+        assert track.duration_str == "03:00"
+        assert track.added_at > time.time() - 1  # Added within last second
+    
+    def test_prepared_info_expiry(self, mock_user):
+        """Test prepared stream info is only reused while it is fresh."""
+        info = {'stream_url': 'https://example.com/audio', 'resolved_at': time.time()}
+        track = Track(
+            query="test song",
+            title="Test Song",
+            url="https://youtube.com/watch?v=test",
+            duration=180,
+            thumbnail="https://img.youtube.com/vi/test/default.jpg",
+            uploader="Test Uploader",
+            requested_by=mock_user,
+            prepared_info=info
+        )
+        
+        assert track.fresh_prepared_info(60) is info
+        
+        # Age comes from the resolve time, not from when the info was attached
+        info['resolved_at'] -= 120
+        assert track.fresh_prepared_info(60) is None
+        
+        # Info without a resolve time is never trusted
+        track.prepared_info = {'stream_url': 'https://example.com/audio'}
+        assert track.fresh_prepared_info(60) is None
\ No newline at end of file